@@ -1,9 +1,15 @@
 import abc
+import asyncio
+import copy
+import functools
+import hashlib
+import json
 import os
 import requests
-import tempfile
-import zipfile
 
+from picli.actions import payload
+from picli.cache.result_cache import get_result_cache
+from picli import engine
 from picli import logger
 from picli import util
 
@@ -15,8 +21,8 @@ class Base(object):
     Defines the set of behaviours that all actions
     must share.
 
-    All actions must have an execute method which will be
-    called by PiCli's command module. The default implementation
+    All actions must have an execute coroutine which will be
+    awaited by PiCli's Engine. The default implementation
     is found here and can be used by subclasses.
 
     """
@@ -26,15 +32,27 @@ class Base(object):
         self.pipe_config = pipe_config
         self.run_config = run_config
         self.run_vars = self._build_run_vars()
+        self._shards = None
 
     def _build_run_vars(self):
-        if self.options.get('options'):
-            run_vars = util.merge_dicts(
-                util.safe_load(self.pipe_config.dump_configs()),
-                self.options
-            )
-        else:
-            run_vars = util.safe_load(self.pipe_config.dump_configs())
+        """
+        Build the run_vars of the action from the ones shared by every
+        action of the pipe. Actions without options use the shared dict
+        itself. Otherwise only the options are merged into a copy of its
+        options key, and every other value, like the file_config list,
+        is shared.
+        :return: dict
+        """
+        shared = self.pipe_config.run_vars
+        if not self.options.get('options'):
+            return shared
+        run_vars = {
+            key: value for key, value in shared.items() if key != 'options'
+        }
+        options = {}
+        if 'options' in shared:
+            options['options'] = copy.deepcopy(shared['options'])
+        run_vars.update(util.merge_dicts(options, self.options))
         return run_vars
 
     @property
@@ -61,35 +79,375 @@ class Base(object):
         return options
 
     @abc.abstractmethod
-    def execute(self):
+    async def execute(self):
         """
         Executes the action analyzer.
 
         This default implementation will zip all files in
         the configuration.files list and send that zipfile
         across the network to the specified SAST analyzer function.
+        The response is returned rather than logged, so that the actions
+        of a pipe can run concurrently and still report in order.
+        When the files are split into shards, the shards are sent in
+        parallel and their responses are merged. Every shard, including
+        the single shard of an unsplit action, waits for the pipe's
+        shard semaphore, so the actions of a pipe never have more than
+        the pipe's concurrency shards in flight between them.
 
-        :return:  None
+        :return: Response text of the function
         """
         LOG.info(f"Executing: {self.name}")
-        with tempfile.TemporaryDirectory() as temp_dir:
-            zip_file = self.zip_files(temp_dir)
-            with open(zip_file.filename, 'rb') as file:
-                files = [('files', file)]
-                try:
-                    if self.pipe_config.debug:
-                        LOG.info(f'Sending zipfile to {self.url}')
-                    r = requests.post(self.url, files=files)
-                except requests.exceptions.RequestException as e:
-                    message = f"Failed to execute {self.name}. \n\n{e}"
-                    util.sysexit_with_message(message)
-                try:
-                    r.raise_for_status()
-                except requests.exceptions.HTTPError as e:
-                    message = f'Failed to execute {self.name}. \n\n{e}'
-                    util.sysexit_with_message(message)
-                else:
-                    LOG.warn(r.text)
+        semaphore = self.pipe_config.shard_semaphore
+
+        async def execute_shard(files):
+            async with semaphore:
+                return await self.execute_shard(files)
+
+        if len(self.shards) == 1:
+            return await execute_shard(self.shards[0])
+        LOG.info(f'Executing: {self.name} in {len(self.shards)} shards')
+        results = await asyncio.gather(
+            *(engine.guard(execute_shard(files)) for files in self.shards)
+        )
+        return self.merge_results(results)
+
+    async def execute_shard(self, files):
+        """
+        Send a single shard of the action's files to its function.
+        :param files: list of file definitions, or None for all files
+        :return: Response text of the function
+        """
+        if self.pipe_config.debug and files is not None:
+            LOG.info(f'Sending a shard of {len(files)} files to {self.name}')
+        if self.pipe_config.per_file_results:
+            return await self.execute_per_file(files)
+        result_cache = None
+        if self.pipe_config.cache_results:
+            result_cache = get_result_cache()
+        if result_cache is not None:
+            key = await self._in_executor(self._result_key, files)
+            result = result_cache.get(key) if key else None
+            if result is not None:
+                if self.pipe_config.debug:
+                    LOG.info(f'Using the cached result of {self.name}')
+                return result
+        if self.pipe_config.content_addressed:
+            result = (await self.upload_missing(files)).text
+        else:
+            result = (await self.upload(
+                functools.partial(self.zip_files, files=files)
+            )).text
+        if result_cache is not None and key:
+            result_cache.set(key, result)
+        return result
+
+    async def execute_per_file(self, files):
+        """
+        Send a shard of the action's files in the per-file results mode.
+        The findings of every file are cached in the ResultCache on their
+        own, so only the files whose findings aren't cached are sent. The
+        function is asked for per-file results with the RESULTS_HEADER
+        and confirms it in its response by answering with a JSON object
+        mapping the files it received to the list of their findings,
+        where files without findings may be left out.
+        Functions that don't confirm the mode are sent every file and
+        their plain response is returned.
+        :param files: list of file definitions, or None for all files
+        :return: Findings of every file, in the order of the files
+        """
+        definitions, digests = await self._in_executor(
+            self._file_digests, files
+        )
+        config = util.safe_dump({
+            key: value for key, value in self.run_vars.items()
+            if key != 'file_config'
+        })
+        keys = {
+            path: self._file_result_key(
+                config, path, definitions[path], digests[path]
+            )
+            for path in digests
+        }
+        result_cache = get_result_cache()
+        findings = {}
+        if result_cache is not None:
+            cached = result_cache.get_many(keys.values())
+            findings = {
+                path: json.loads(cached[key])
+                for path, key in keys.items() if key in cached
+            }
+        send = [
+            file for path, file in definitions.items() if path not in findings
+        ]
+        if self.pipe_config.debug:
+            LOG.info(f'Using the cached results of {len(findings)} of '
+                     f'{len(definitions)} files of {self.name}')
+        if send:
+            r = await self.upload(
+                functools.partial(self.zip_files, files=send),
+                headers={payload.RESULTS_HEADER: payload.PER_FILE}
+            )
+            if r.headers.get(payload.RESULTS_HEADER) != payload.PER_FILE:
+                LOG.debug(f'{self.name} does not support per-file results.')
+                if findings:
+                    r = await self.upload(functools.partial(
+                        self.zip_files, files=list(definitions.values())
+                    ))
+                return r.text
+            try:
+                results = r.json()
+                fresh = {
+                    path: [str(finding) for finding in results.get(path, ())]
+                    for path in definitions if path not in findings
+                }
+            except (ValueError, AttributeError, TypeError) as e:
+                message = f'Failed to execute {self.name}. ' \
+                          f'Invalid per-file response. \n\n{e}'
+                util.sysexit_with_message(message)
+            findings.update(fresh)
+            if result_cache is not None:
+                result_cache.set_many(
+                    (keys[path], json.dumps(file_findings))
+                    for path, file_findings in fresh.items() if path in keys
+                )
+        return '\n'.join(
+            finding for path in definitions for finding in findings[path]
+        )
+
+    def _file_result_key(self, config, path, file, digest):
+        """
+        Key of the findings of a single file in the ResultCache. It covers
+        the action, its function and version, its run_vars apart from
+        the list of files, the file's own variables and its path and
+        content digest, so adding or changing other files keeps the key.
+        :param config: run_vars.yml of the action without file_config
+        :param path: repo-relative path of the file
+        :param file: file definition
+        :param digest: hex digest of the file's content
+        :return: str
+        """
+        key = json.dumps([
+            self.name,
+            self.url,
+            self.pipe_config.version,
+            config,
+            {name: value for name, value in file.items() if name != 'file'},
+            self.pipe_config.digests.algorithm,
+            path,
+            digest
+        ], sort_keys=True, default=str)
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _result_key(self, files):
+        """
+        Key of the response of the function to files in the ResultCache.
+        It covers the action, its function and version, its run_vars and
+        the path and content digest of every file sent.
+        :param files: list of file definitions, or None for all files
+        :return: str, or None if a file couldn't be hashed
+        """
+        definitions, digests = self._file_digests(files)
+        if len(digests) != len(definitions):
+            return None
+        key = json.dumps([
+            self.name,
+            self.url,
+            self.pipe_config.version,
+            util.safe_dump(self.run_vars),
+            self.pipe_config.digests.algorithm,
+            sorted(digests.items())
+        ])
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _file_digests(self, files):
+        """
+        Content digests of the files of a shard.
+        :param files: list of file definitions, or None for all files
+        :return: tuple of dict of repo-relative path to file definition
+                 and dict of repo-relative path to hex digest. Files that
+                 can't be read have no digest.
+        """
+        if files is None:
+            files = self.run_config.files
+        file_index = self.pipe_config.file_index
+        definitions = {
+            file_index.relative_path(file['file']): file for file in files
+        }
+        digests = {
+            path: file_digest.digest
+            for path, file_digest in
+            self.pipe_config.digests.manifest(definitions).items()
+        }
+        return definitions, digests
+
+    async def upload_missing(self, files):
+        """
+        Upload files with the content-addressed protocol.
+        A manifest of the digests of the files is sent to the function
+        first, which answers with the digests of the blobs it doesn't
+        have. Only those files are zipped, together with the manifest, and
+        the function restores every other file from its blob store.
+        Functions that don't support the protocol, or that lost a blob
+        after answering, are sent every file instead.
+        :param files: list of file definitions, or None for all files
+        :return: requests.Response
+        """
+        definitions, digests = await self._in_executor(
+            self._file_digests, files
+        )
+        document = payload.manifest(self.pipe_config.digests.algorithm, digests)
+        missing = await self._negotiate(document)
+        if missing is not None:
+            files = [
+                file for path, file in definitions.items()
+                if path not in digests or digests[path] in missing
+            ]
+            if self.pipe_config.debug:
+                LOG.info(f'Uploading {len(files)} of {len(definitions)} '
+                         f'files to {self.name}')
+
+            def write_archive(zip_file):
+                self.zip_files(zip_file, files=files)
+                zip_file.writestr(payload.MANIFEST_FILE, document)
+
+            r = await self._post(write_archive)
+            if r.status_code != 409:
+                return self._check(r)
+            LOG.debug(f'{self.name} lost blobs of the upload, '
+                      f'sending every file.')
+        return await self.upload(functools.partial(
+            self.zip_files, files=list(definitions.values())
+        ))
+
+    async def _negotiate(self, document):
+        """
+        Send the manifest of an upload to the function.
+        :param document: Manifest rendered by payload.manifest
+        :return: set of the digests of the blobs the function is
+                 missing, or None if the function doesn't support
+                 content-addressed uploads
+        """
+        try:
+            r = await self.pipe_config.transport.post_async(
+                f'{self.url}/{payload.MANIFEST_PATH}',
+                data=document,
+                headers={'Content-Type': 'application/json'},
+                timeout=self.pipe_config.timeout
+            )
+        except requests.exceptions.RequestException as e:
+            message = f"Failed to execute {self.name}. \n\n{e}"
+            util.sysexit_with_message(message)
+        if 400 <= r.status_code < 500 or r.status_code == 501:
+            LOG.debug(f'{self.name} does not support content-addressed '
+                      f'uploads, sending every file.')
+            return None
+        try:
+            return set(self._check(r).json()['missing'])
+        except (ValueError, KeyError, TypeError) as e:
+            LOG.warn(f'Invalid manifest response from {self.name}, '
+                     f'sending every file. {e}')
+            return None
+
+    @property
+    def shards(self):
+        """
+        The action's files split by the pipe's sharding limits. Without
+        limits there is a single shard, None, standing for every file of
+        the run config.
+        :return: list of lists of file definitions
+        """
+        if self._shards is None:
+            sharding = self.pipe_config.sharding
+            if sharding:
+                self._shards = payload.shard(
+                    self.run_config.files,
+                    sharding.get('files'),
+                    sharding.get('size')
+                )
+            else:
+                self._shards = [None]
+        return self._shards
+
+    def merge_results(self, results):
+        """
+        Merge the responses of the shards of the action into one report,
+        in the order of the shards.
+        :param results: list of response texts
+        :return: str
+        """
+        if len(results) == 1:
+            return results[0]
+        return '\n'.join(result.rstrip('\n') for result in results if result)
+
+    async def upload(self, write_archive, filename=None, headers=None):
+        """
+        Stream a zipfile to the action's function.
+        The archive is compressed while it is being sent, as the body
+        of a chunked multipart request, so memory use doesn't grow with
+        the size of the archive.
+        :param write_archive: Function writing the entries of the
+                              archive into the zipfile.ZipFile it's given
+        :param filename: Filename of the zipfile, {name}.zip by default
+        :param headers: dict of additional request headers
+        :return: requests.Response
+        """
+        return self._check(await self._post(write_archive, filename, headers))
+
+    async def _post(self, write_archive, filename=None, headers=None):
+        archive = payload.ZipStream(write_archive)
+        body, content_type = payload.multipart(
+            'files', filename or f'{self.name}.zip', archive
+        )
+        headers = dict(headers or {}, **{'Content-Type': content_type})
+        try:
+            if self.pipe_config.debug:
+                LOG.info(f'Sending zipfile to {self.url}')
+            r = await self.pipe_config.transport.post_async(
+                self.url,
+                data=body,
+                headers=headers,
+                timeout=self.pipe_config.timeout
+            )
+        except payload.PayloadError as e:
+            message = f'Zipping failed in {self.name}. \n\n{e}'
+            util.sysexit_with_message(message)
+        except requests.exceptions.RequestException as e:
+            message = f"Failed to execute {self.name}. \n\n{e}"
+            util.sysexit_with_message(message)
+        finally:
+            archive.close()
+        return r
+
+    def _check(self, r):
+        try:
+            r.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            message = f'Failed to execute {self.name}. \n\n{e}'
+            util.sysexit_with_message(message)
+        return r
+
+    async def _in_executor(self, function, *args):
+        """
+        Run a function that reads or hashes files, such as
+        _file_digests, on the event loop's default executor so it
+        doesn't hold up the other actions.
+        :param function: Function to call
+        :param args: Arguments of function
+        :return: Result of function
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, engine.call, function, *args
+        )
+
+    def report(self, result):
+        """
+        Log the result returned by execute.
+        :param result: Result returned by execute
+        :return: None
+        """
+        if result is not None:
+            LOG.warn(result)
 
     @property
     @abc.abstractmethod
@@ -107,17 +465,18 @@ class Base(object):
                    f'piedpiper-{self.name}-function-{url_version}'
 
     @abc.abstractmethod
-    def zip_files(self, destination):
+    def zip_files(self, zip_file, files=None):
         """
         Zips all files in the run_config.files list if they match
         the SAST analyzer.
-        :param destination: Path to create the zipfile in
-        :return: ZipFile
+        :param zip_file: zipfile.ZipFile to write the files to
+        :param files: list of file definitions of the shard to zip, or
+                      None for every file of the run config
+        :return: None
         """
-        zip_file = zipfile.ZipFile(
-            f'{destination}/{self.name}.zip', 'w', zipfile.ZIP_DEFLATED
-        )
-        for file in self.run_config.files:
+        if files is None:
+            files = self.run_config.files
+        for file in files:
             if self.pipe_config.debug:
                 message = f'Writing {file["file"]} to zip'
                 LOG.info(message)
@@ -133,10 +492,6 @@ class Base(object):
             LOG.info(message)
         zip_file.writestr("run_vars.yml", util.safe_dump(self.run_vars))
 
-        zip_file.close()
-
-        return zip_file
-
     @property
     def enabled(self):
         return self.run_config.run_pipe
@@ -0,0 +1,185 @@
+import json
+import os
+import queue
+import threading
+import zipfile
+
+from picli import logger
+
+LOG = logger.get_logger(__name__)
+
+CHUNK_SIZE = 256 * 1024
+MANIFEST_FILE = '.picli-manifest.json'
+MANIFEST_PATH = 'manifest'
+RESULTS_HEADER = 'X-PiCli-Results'
+PER_FILE = 'per-file'
+_QUEUE_SIZE = 8
+_DONE = object()
+
+
+class PayloadError(Exception):
+    """Raised while streaming a payload that couldn't be built"""
+
+
+class _Cancelled(Exception):
+    pass
+
+
+class ZipStream(object):
+    """Zip archive streamed as an iterator of chunks
+
+    The archive is written by a background thread into a bounded queue
+    of CHUNK_SIZE chunks which the iterator hands out as they are
+    produced, so the archive can be uploaded while it is still being
+    compressed and never more than a few chunks are held in memory,
+    whatever the size of the archive. Closing the stream from another
+    thread, as when the action sending it is cancelled, ends the
+    iteration with a PayloadError so the upload is abandoned.
+    """
+
+    def __init__(self, write_archive):
+        """
+        :param write_archive: Function writing the entries of the
+                              archive into the zipfile.ZipFile it's given
+        """
+        self._write_archive = write_archive
+        self._queue = queue.Queue(maxsize=_QUEUE_SIZE)
+        self._buffer = bytearray()
+        self._closed = threading.Event()
+        self._thread = None
+
+    def __iter__(self):
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+        self._thread.start()
+        try:
+            while True:
+                try:
+                    chunk = self._queue.get(timeout=0.1)
+                except queue.Empty:
+                    if self._closed.is_set():
+                        raise PayloadError('The upload was cancelled')
+                    continue
+                if chunk is _DONE:
+                    return
+                if isinstance(chunk, BaseException):
+                    raise PayloadError(chunk) from chunk
+                yield chunk
+        finally:
+            self.close()
+
+    def write(self, data):
+        self._buffer += data
+        while len(self._buffer) >= CHUNK_SIZE:
+            self._put(bytes(self._buffer[:CHUNK_SIZE]))
+            del self._buffer[:CHUNK_SIZE]
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        """
+        Stop producing the archive and release the producer thread.
+        :return: None
+        """
+        self._closed.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def _put(self, chunk):
+        while not self._closed.is_set():
+            try:
+                self._queue.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise _Cancelled()
+
+    def _produce(self):
+        try:
+            with zipfile.ZipFile(self, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                self._write_archive(zip_file)
+            if self._buffer:
+                self._put(bytes(self._buffer))
+            self._put(_DONE)
+        except _Cancelled:
+            pass
+        except BaseException as e:
+            try:
+                self._put(e)
+            except _Cancelled:
+                pass
+
+
+def shard(files, max_files=None, max_size=None):
+    """
+    Split file definitions into consecutive shards holding at most
+    max_files files and max_size bytes each. A file larger than max_size
+    gets a shard of its own. Sizes are only read from the filesystem when
+    max_size is given.
+    :param files: iterable of file definitions
+    :param max_files: Largest number of files of a shard, or None
+    :param max_size: Largest number of bytes of a shard, or None
+    :return: list of lists of file definitions
+    """
+    shards = []
+    current = []
+    current_size = 0
+    for file in files:
+        size = 0
+        if max_size is not None:
+            try:
+                size = os.stat(file['file']).st_size
+            except OSError:
+                pass
+        if current and (
+                (max_files is not None and len(current) >= max_files) or
+                (max_size is not None and current_size + size > max_size)):
+            shards.append(current)
+            current = []
+            current_size = 0
+        current.append(file)
+        current_size += size
+    if current or not shards:
+        shards.append(current)
+    return shards
+
+
+def manifest(algorithm, digests):
+    """
+    Render the manifest of a content-addressed upload. The manifest is
+    sent to the function's MANIFEST_PATH to learn which blobs it is
+    missing, and is written to the archive as MANIFEST_FILE so the
+    function can restore the files that weren't uploaded from the blobs
+    it already has.
+    :param algorithm: Name of the hash algorithm of the digests
+    :param digests: dict of repo-relative path to hex digest
+    :return: str
+    """
+    return json.dumps({'algorithm': algorithm, 'files': digests}, sort_keys=True)
+
+
+def multipart(name, filename, chunks):
+    """
+    Wrap a stream of chunks into a multipart/form-data body holding a
+    single file field.
+    :param name: Name of the form field
+    :param filename: Filename of the field
+    :param chunks: iterable of bytes
+    :return: tuple of the body iterator and its Content-Type
+    """
+    boundary = os.urandom(16).hex()
+
+    def body():
+        yield (
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="{name}"; '
+            f'filename="{filename}"\r\n\r\n'
+        ).encode()
+        yield from chunks
+        yield f'\r\n--{boundary}--\r\n'.encode()
+
+    return body(), f'multipart/form-data; boundary={boundary}'
@@ -23,8 +23,8 @@ class Flake8(base.Base):
     def url(self):
         return super().url
 
-    def zip_files(self, destination):
-        return super().zip_files(destination)
+    def zip_files(self, destination, files=None):
+        return super().zip_files(destination, files)
 
-    def execute(self):
-        super().execute()
+    async def execute(self):
+        return await super().execute()
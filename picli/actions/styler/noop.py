@@ -24,7 +24,11 @@ class Noop(base.Base):
     def url(self):
         pass
 
-    def execute(self):
+    @property
+    def shards(self):
+        return [None]
+
+    async def execute(self):
         LOG.info(f"Executing styler {self.name}")
         for file in self.run_config.files:
             message = f'Executing {self.name} on {file["file"]}'
@@ -1,7 +1,4 @@
-import tempfile
-import requests
 import json
-import zipfile
 
 from picli.actions import base
 from picli import logger
@@ -37,45 +34,29 @@ class Validator(base.Base):
     def url(self):
         return super().url
 
-    def zip_files(self, destination):
+    @property
+    def shards(self):
+        return [None]
+
+    def zip_files(self, zip_file):
         """
-        Create a zipfile containing run variables of PiCli.
-        :param destination: Directory to write zipfile to
-        :return: ZipFile
+        Write the run variables of PiCli to the zipfile.
+        :param zip_file: zipfile.ZipFile to write to
+        :return: None
         """
+        if self.pipe_config.debug:
+            message = f'Writing run_vars.yml to zip'
+            LOG.info(message)
+        zip_file.writestr("run_vars.yml", self.pipe_config.dump_configs())
+
+    async def execute(self):
+        r = await self.upload(self.zip_files, 'validation.zip')
         try:
-            zip_file = zipfile.ZipFile(
-                f'{destination}/validation.zip', 'w', zipfile.ZIP_DEFLATED
-            )
-            if self.pipe_config.debug:
-                message = f'Writing run_vars.yml to zip'
-                LOG.info(message)
-            zip_file.writestr("run_vars.yml", self.pipe_config.dump_configs())
-            zip_file.close()
-            return zip_file
-        except Exception as e:
-            message = f"Zipping failed in validator. \n\n{e}"
+            results = r.json()
+        except ValueError as e:
+            message = f'Failed to execute validator. \n\n{e}'
             util.sysexit_with_message(message)
-
-    def execute(self):
-        with tempfile.TemporaryDirectory() as temp_dir:
-            zip_file = self.zip_files(temp_dir)
-            files = [('files', open(zip_file.filename, 'rb'))]
-            try:
-                if self.pipe_config.debug:
-                    LOG.info(f'Sending zipfile to {self.url}')
-                r = requests.post(self.url, files=files)
-            except requests.exceptions.RequestException as e:
-                message = f'Failed to execute validator. \n\n{e}'
-                util.sysexit_with_message(message)
-            try:
-                r.raise_for_status()
-            except requests.exceptions.HTTPError as e:
-                message = f'Failed to execute validator. \n\n{e}'
-                util.sysexit_with_message(message)
-            else:
-                results = r.json()
-                self._parse_results(results)
+        self._parse_results(results)
 
     def _parse_results(self, results):
         """
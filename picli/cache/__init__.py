@@ -0,0 +1,24 @@
+import os
+
+
+def cache_dir(*paths):
+    """
+    Return a directory inside PiCli's cache, creating it if needed.
+
+    The cache lives in $PICLI_CACHE_DIR when it is set, otherwise in
+    $XDG_CACHE_HOME/picli (~/.cache/picli by default). CI runners with
+    persistent workspaces can point PICLI_CACHE_DIR into the workspace
+    to keep the cache between pipelines.
+    :param paths: Path components below the cache root
+    :return: Path to the directory or None if it can't be created
+    """
+    root = os.environ.get('PICLI_CACHE_DIR') or os.path.join(
+        os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'),
+        'picli'
+    )
+    directory = os.path.join(root, *paths)
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError:
+        return None
+    return directory
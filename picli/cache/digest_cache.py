@@ -0,0 +1,127 @@
+import functools
+import os
+import sqlite3
+import threading
+import time
+
+from picli.cache import cache_dir
+from picli import logger
+
+LOG = logger.get_logger(__name__)
+
+_SCHEMA_VERSION = 1
+_RACY_WINDOW_NS = 2 * 10 ** 9
+_EXPIRE_DAYS = 30
+_SECONDS_PER_DAY = 24 * 60 * 60
+
+
+class DigestCache(object):
+    """Persistent cache of file content digests
+
+    Digests are stored in a SQLite database keyed by the device, inode,
+    size and mtime of the file they were computed from, so a file whose
+    stat is unchanged is never read again to be hashed. Like git's index,
+    files modified within the mtime granularity of the time they were
+    hashed are not stored, since a later change may not move their mtime.
+    Entries that haven't been used for 30 days are dropped.
+    """
+
+    def __init__(self, database):
+        self.database = database
+        self._lock = threading.Lock()
+        self._connection = None
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            connection = sqlite3.connect(
+                self.database, timeout=10, check_same_thread=False
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            version = connection.execute('PRAGMA user_version').fetchone()[0]
+            if version != _SCHEMA_VERSION:
+                with connection:
+                    connection.execute('DROP TABLE IF EXISTS digests')
+                    connection.execute(
+                        'CREATE TABLE digests ('
+                        'dev INTEGER, ino INTEGER, size INTEGER, '
+                        'mtime_ns INTEGER, digest TEXT, used INTEGER, '
+                        'PRIMARY KEY (dev, ino, size, mtime_ns)'
+                        ') WITHOUT ROWID'
+                    )
+                    connection.execute(
+                        f'PRAGMA user_version={_SCHEMA_VERSION}'
+                    )
+            self._connection = connection
+        return self._connection
+
+    def get_many(self, keys):
+        """
+        Look up the digests of several files.
+        :param keys: iterable of (dev, ino, size, mtime_ns) tuples
+        :return: dict of key to digest for every key found
+        """
+        today = int(time.time() // _SECONDS_PER_DAY)
+        found = {}
+        stale = []
+        try:
+            with self._lock:
+                cursor = self.connection.cursor()
+                for key in keys:
+                    row = cursor.execute(
+                        'SELECT digest, used FROM digests WHERE '
+                        'dev=? AND ino=? AND size=? AND mtime_ns=?', key
+                    ).fetchone()
+                    if row is not None:
+                        found[key] = row[0]
+                        if row[1] < today:
+                            stale.append((today,) + key)
+                if stale:
+                    with self.connection:
+                        self.connection.executemany(
+                            'UPDATE digests SET used=? WHERE '
+                            'dev=? AND ino=? AND size=? AND mtime_ns=?', stale
+                        )
+        except sqlite3.Error as e:
+            LOG.debug(f'Failed to read digest cache {self.database}. {e}')
+        return found
+
+    def set_many(self, entries):
+        """
+        Store the digests of several files and drop expired entries.
+        :param entries: iterable of ((dev, ino, size, mtime_ns), digest)
+        :return: None
+        """
+        racy = time.time_ns() - _RACY_WINDOW_NS
+        today = int(time.time() // _SECONDS_PER_DAY)
+        rows = [
+            key + (digest, today)
+            for key, digest in entries
+            if key[3] < racy
+        ]
+        try:
+            with self._lock, self.connection:
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?)',
+                    rows
+                )
+                self.connection.execute(
+                    'DELETE FROM digests WHERE used < ?',
+                    (today - _EXPIRE_DAYS,)
+                )
+        except sqlite3.Error as e:
+            LOG.debug(f'Failed to write digest cache {self.database}. {e}')
+
+
+@functools.lru_cache(maxsize=None)
+def get_digest_cache(algorithm):
+    """
+    Return the DigestCache for algorithm in PiCli's cache directory, or
+    None when the cache directory is unavailable.
+    :param algorithm: Name of the hashlib algorithm of the digests
+    :return: DigestCache object or None
+    """
+    directory = cache_dir('digests')
+    if directory:
+        return DigestCache(os.path.join(directory, f'{algorithm}.sqlite'))
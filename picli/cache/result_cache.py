@@ -0,0 +1,168 @@
+import functools
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from picli.cache import cache_dir
+from picli import logger
+
+LOG = logger.get_logger(__name__)
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+_SCHEMA_VERSION = 1
+_BATCH_SIZE = 500
+
+
+class ResultCache(object):
+    """Persistent cache of the responses of PiedPiper's functions
+
+    Responses are stored compressed in a SQLite database under a key
+    describing everything that was sent to the function, so a request
+    whose key is found doesn't need to be sent again. The database is
+    kept below max_size bytes by evicting the least recently used
+    responses whenever a new one is stored.
+    """
+
+    def __init__(self, database, max_size=DEFAULT_MAX_SIZE):
+        self.database = database
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._connection = None
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            connection = sqlite3.connect(
+                self.database, timeout=10, check_same_thread=False
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            version = connection.execute('PRAGMA user_version').fetchone()[0]
+            if version != _SCHEMA_VERSION:
+                with connection:
+                    connection.execute('DROP TABLE IF EXISTS results')
+                    connection.execute(
+                        'CREATE TABLE results ('
+                        'key TEXT PRIMARY KEY, response BLOB, '
+                        'size INTEGER, used REAL'
+                        ') WITHOUT ROWID'
+                    )
+                    connection.execute(
+                        'CREATE INDEX results_used ON results (used)'
+                    )
+                    connection.execute(
+                        f'PRAGMA user_version={_SCHEMA_VERSION}'
+                    )
+            self._connection = connection
+        return self._connection
+
+    def get(self, key):
+        """
+        Look up a response and mark it as recently used.
+        :param key: Key the response was stored under
+        :return: str or None if the key isn't in the cache
+        """
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys):
+        """
+        Look up several responses and mark them as recently used.
+        :param keys: iterable of keys
+        :return: dict of key to response for every key found
+        """
+        keys = list(keys)
+        found = {}
+        try:
+            with self._lock:
+                for start in range(0, len(keys), _BATCH_SIZE):
+                    batch = keys[start:start + _BATCH_SIZE]
+                    found.update(self.connection.execute(
+                        'SELECT key, response FROM results WHERE key IN '
+                        f'({", ".join("?" * len(batch))})', batch
+                    ))
+                if found:
+                    now = time.time()
+                    with self.connection:
+                        self.connection.executemany(
+                            'UPDATE results SET used=? WHERE key=?',
+                            ((now, key) for key in found)
+                        )
+            return {
+                key: zlib.decompress(response).decode()
+                for key, response in found.items()
+            }
+        except (sqlite3.Error, zlib.error) as e:
+            LOG.debug(f'Failed to read result cache {self.database}. {e}')
+            return {}
+
+    def set(self, key, response):
+        """
+        Store a response, evicting the least recently used responses
+        until the cache fits in max_size bytes.
+        :param key: Key to store the response under
+        :param response: str
+        :return: None
+        """
+        self.set_many([(key, response)])
+
+    def set_many(self, entries):
+        """
+        Store several responses, evicting the least recently used
+        responses until the cache fits in max_size bytes.
+        :param entries: iterable of (key, response) tuples
+        :return: None
+        """
+        now = time.time()
+        rows = []
+        for key, response in entries:
+            compressed = zlib.compress(response.encode())
+            size = len(key) + len(compressed)
+            if size <= self.max_size:
+                rows.append((key, compressed, size, now))
+        if not rows:
+            return
+        try:
+            with self._lock, self.connection:
+                self.connection.executemany(
+                    'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)', rows
+                )
+                self._evict()
+        except sqlite3.Error as e:
+            LOG.debug(f'Failed to write result cache {self.database}. {e}')
+
+    def _evict(self):
+        total = self.connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM results'
+        ).fetchone()[0]
+        if total <= self.max_size:
+            return
+        evicted = []
+        for key, size in self.connection.execute(
+                'SELECT key, size FROM results ORDER BY used'):
+            if total <= self.max_size:
+                break
+            evicted.append((key,))
+            total -= size
+        self.connection.executemany('DELETE FROM results WHERE key=?', evicted)
+        LOG.debug(f'Evicted {len(evicted)} results from {self.database}')
+
+
+@functools.lru_cache(maxsize=None)
+def get_result_cache():
+    """
+    Return the ResultCache in PiCli's cache directory, or None when the
+    cache directory is unavailable. $PICLI_RESULT_CACHE_SIZE sets its
+    size in bytes.
+    :return: ResultCache object or None
+    """
+    directory = cache_dir('results')
+    if directory:
+        try:
+            max_size = int(os.environ.get(
+                'PICLI_RESULT_CACHE_SIZE', DEFAULT_MAX_SIZE
+            ))
+        except ValueError:
+            max_size = DEFAULT_MAX_SIZE
+        return ResultCache(os.path.join(directory, 'results.sqlite'), max_size)
@@ -0,0 +1,82 @@
+import functools
+import hashlib
+import marshal
+import os
+import tempfile
+
+from picli.cache import cache_dir
+from picli import logger
+
+LOG = logger.get_logger(__name__)
+
+
+class YamlCache(object):
+    """On-disk cache of parsed YAML documents
+
+    Parsed documents are stored in marshal format, one entry per source
+    file, and are only returned when the path, size, mtime and content
+    hash of the source all match the entry. Documents marshal can't
+    represent, such as YAML timestamps, are simply not cached.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _entry(self, path):
+        key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()
+        return os.path.join(self.directory, f'{key}.marshal')
+
+    def get(self, path, stat, digest):
+        """
+        Return the cached document for path or None on a miss.
+        :param path: Path of the YAML file
+        :param stat: os.stat_result of the YAML file
+        :param digest: Content hash of the YAML file
+        :return: Parsed document or None
+        """
+        try:
+            with open(self._entry(path), 'rb') as entry:
+                key, document = marshal.loads(entry.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if key != (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, digest):
+            return None
+        return document
+
+    def set(self, path, stat, digest, document):
+        """
+        Store the parsed document for path.
+        :param path: Path of the YAML file
+        :param stat: os.stat_result of the YAML file
+        :param digest: Content hash of the YAML file
+        :param document: Parsed document
+        :return: None
+        """
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, digest)
+        try:
+            data = marshal.dumps((key, document))
+        except ValueError:
+            return
+        try:
+            with tempfile.NamedTemporaryFile(
+                    dir=self.directory, delete=False) as entry:
+                entry.write(data)
+            os.replace(entry.name, self._entry(path))
+        except OSError as e:
+            LOG.debug(f'Failed to cache {path}. {e}')
+
+
+@functools.lru_cache(maxsize=None)
+def get_yaml_cache():
+    """
+    Return the YamlCache in PiCli's cache directory, or None when the
+    cache directory is unavailable.
+    :return: YamlCache object or None
+    """
+    directory = cache_dir('yaml')
+    if directory:
+        return YamlCache(directory)
+
+
+def digest(content):
+    return hashlib.sha256(content).hexdigest()
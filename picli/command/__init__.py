@@ -1,5 +1,6 @@
 from picli.command import base  # NOQA
 from picli.command import lint  # noqa
+from picli.command import plan  # noqa
 from picli.command import style  # noqa
 from picli.command import sast  # noqa
 from picli.command import validate  # noqa
@@ -1,20 +1,41 @@
 import abc
+import click
 import picli
+from picli.engine import Engine
 from picli import logger
 from picli import util
 
 LOG = logger.get_logger(__name__)
 
+changed_since_option = click.option(
+    '--changed-since',
+    metavar='REF',
+    default=None,
+    help='Only use the files changed between the git REF and the work tree'
+)
+
 
 class Base(object):
     __metaclass__ = abc.ABCMeta
 
-    def __init__(self, base_config, debug):
-        self._base_config = base_config
-        self.debug = debug
+    def __init__(self, context):
+        self._context = context
+        self.debug = context.debug
 
-    @abc.abstractmethod
     def execute(self):
+        """
+        Executes the subcommand's actions on an Engine.
+        :return: list of results of the actions
+        """
+        self.print_info()
+        return Engine().run(self.actions())
+
+    @abc.abstractmethod
+    def actions(self):
+        """
+        Build the actions of the subcommand.
+        :return: list of action objects
+        """
         pass
 
     def print_info(self):
@@ -22,21 +43,49 @@ class Base(object):
         LOG.info(message)
 
 
-def execute_subcommand(config, subcommand, debug):
+def execute_subcommand(context, subcommand):
     """
     Dynamically discover a subcommand module and class based on
     the subcommand we are executing.
     After discovery, initialize and run the execute method
     on the discovered command object.
-    :param config: Configuration file
+    :param context: RunContext shared by every subcommand of the run
     :param subcommand: The subcommand we are executing
-    :param debug: boolean
     :return:
     """
     command_module = getattr(picli.command, subcommand)
     command = getattr(command_module, util.camelize(subcommand))
 
-    return command(config, debug).execute()
+    return command(context).execute()
+
+
+def execute_sequence(context, sequence):
+    """
+    Execute a sequence of subcommands.
+    validate gates the run: its actions finish before any other
+    subcommand's actions start, so nothing is sent to a function unless
+    validation passed. The actions of the remaining subcommands are run
+    together by one Engine, so style and sast functions execute at the
+    same time. Every stage sends its function calls over the
+    connections of the context's Transport, which are only closed once
+    the whole sequence is done.
+    :param context: RunContext shared by every subcommand of the run
+    :param sequence: list of subcommands
+    :return: None
+    """
+    stages = [[subcommand] for subcommand in sequence if subcommand == 'validate']
+    stages.append([subcommand for subcommand in sequence if subcommand != 'validate'])
+    try:
+        for stage in stages:
+            actions = []
+            for subcommand in stage:
+                command_module = getattr(picli.command, subcommand)
+                command = getattr(command_module, util.camelize(subcommand))(context)
+                command.print_info()
+                actions.extend(command.actions())
+            Engine().run(actions)
+    finally:
+        context.close()
 
 
 def get_sequence(step):
@@ -59,5 +108,9 @@ def get_sequence(step):
         return [
             'sast'
         ]
+    elif step == 'plan':
+        return [
+            'plan'
+        ]
     else:
         util.sysexit_with_message(f"picli sequence not found for {step}")
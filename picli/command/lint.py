@@ -1,21 +1,23 @@
 import click
 from picli.command import base
+from picli.context import RunContext
 from picli import logger
 
 LOG = logger.get_logger(__name__)
 
 
 @click.command()
+@base.changed_since_option
 @click.pass_context
-def lint(context):
+def lint(context, changed_since):
     """
     Command used to execute the "lint" container found in
     command.base
     :param context:
+    :param changed_since: git revision to restrict the run to
     :return: None
     """
     config_file = context.obj.get('args')['config']
     debug = context.obj.get('args')['debug']
-    sequence = base.get_sequence('lint')
-    for action in sequence:
-        base.execute_subcommand(config_file, action, debug)
+    run_context = RunContext(config_file, debug, changed_since)
+    base.execute_sequence(run_context, base.get_sequence('lint'))
@@ -0,0 +1,51 @@
+import click
+from picli.command import base
+from picli.context import RunContext
+from picli import logger
+from picli.routing import RoutingPlan
+
+LOG = logger.get_logger(__name__)
+
+
+class Plan(base.Base):
+    def __init__(self, context):
+        super(Plan, self).__init__(context)
+
+    def execute(self):
+        """
+        Executes the plan step.
+
+        Resolves the configuration of every pipe and writes the
+        resulting routing table to the plan file in the project
+        directory, where lint, style and sast pick it up for as long
+        as the configuration and the project tree don't change.
+        :return: None
+        """
+        self.print_info()
+        plan = RoutingPlan.build(self._context)
+        plan.save(self._context.plan_file)
+        message = f'Wrote plan for {len(plan.files)} files to ' \
+                  f'{self._context.plan_file}'
+        LOG.success(message)
+
+    def actions(self):
+        return []
+
+
+@click.command()
+@base.changed_since_option
+@click.pass_context
+def plan(context, changed_since):
+    """
+    Resolve group_vars, file_vars and pipe_vars into a plan that later
+    lint, style and sast runs load instead of resolving them again.
+    :param context:
+    :param changed_since: git revision to restrict the plan to
+    :return: None
+    """
+    config_file = context.obj.get('args')['config']
+    debug = context.obj.get('args')['debug']
+    run_context = RunContext(config_file, debug, changed_since, use_plan=False)
+    sequence = base.get_sequence('plan')
+    for action in sequence:
+        base.execute_subcommand(run_context, action)
@@ -1,6 +1,6 @@
 import click
 from picli.command import base
-from picli.configs.sast_pipe import SastPipeConfig
+from picli.context import RunContext
 from picli import logger
 from picli import util
 import importlib
@@ -9,31 +9,39 @@ LOG = logger.get_logger(__name__)
 
 
 class Sast(base.Base):
-    def __init__(self, base_config, debug):
-        super(Sast, self).__init__(base_config, debug)
+    def __init__(self, context):
+        super(Sast, self).__init__(context)
 
-    def execute(self):
-        self.print_info()
-        sast_pipe_config = SastPipeConfig(self._base_config, self.debug)
+    def actions(self):
+        """
+        Build a SAST analyzer for every run_config of the SastPipeConfig.
+        :return: list of SAST analyzers
+        """
+        sast_pipe_config = self._context.pipe_config('sast')
+        sast_analyzers = []
         if sast_pipe_config.run_pipe:
             for run_config in sast_pipe_config.run_config:
+                if self._context.changed_since and run_config.is_empty():
+                    LOG.info(f'No changed files in {run_config.name}.'
+                             f'\n\nSkipping...')
+                    continue
                 sast_module = getattr(
                     importlib.import_module(
                         f'picli.actions.sast.{run_config.config[0]["sast"]}'
                     ),
                     f'{util.camelize(run_config.config[0]["sast"])}'
                 )
-                sast_analyzer = sast_module(sast_pipe_config, run_config)
-                sast_analyzer.execute()
+                sast_analyzers.append(sast_module(sast_pipe_config, run_config))
         else:
             LOG.warn("SAST step not enabled.\n\nSkipping...")
+        return sast_analyzers
 
 
 @click.command()
+@base.changed_since_option
 @click.pass_context
-def sast(context):
+def sast(context, changed_since):
     config_file = context.obj.get('args')['config']
     debug = context.obj.get('args')['debug']
-    sequence = base.get_sequence('sast')
-    for action in sequence:
-        base.execute_subcommand(config_file, action, debug)
+    run_context = RunContext(config_file, debug, changed_since)
+    base.execute_sequence(run_context, base.get_sequence('sast'))
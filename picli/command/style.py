@@ -1,6 +1,6 @@
 import click
 from picli.command import base
-from picli.configs.style_pipe import StylePipeConfig
+from picli.context import RunContext
 from picli import logger
 from picli import util
 import importlib
@@ -9,41 +9,46 @@ LOG = logger.get_logger(__name__)
 
 
 class Style(base.Base):
-    def __init__(self, base_config, debug):
-        super(Style, self).__init__(base_config, debug)
+    def __init__(self, context):
+        super(Style, self).__init__(context)
 
-    def execute(self):
+    def actions(self):
         """
-        Executes the style step.
+        Builds the actions of the style step.
 
         We will first initialize a StylePipeConfig object, passing in
         the 'pi_global_vars.yml' configuration file and a debug flag.
         We will then dynamically discover which styler we need to run
-        based on the run_config of the StylePipeConfig object and then
-        execute that styler.
-        :return:
+        based on the run_config of the StylePipeConfig object. The
+        stylers are executed by the Engine, up to the pipe's concurrency
+        at once.
+        :return: list of stylers
         """
-        self.print_info()
-        style_pipe_config = StylePipeConfig(self._base_config, self.debug)
+        style_pipe_config = self._context.pipe_config('style')
+        stylers = []
         if style_pipe_config.run_pipe:
             for run_config in style_pipe_config.run_config:
+                if self._context.changed_since and run_config.is_empty():
+                    LOG.info(f'No changed files in {run_config.name}.'
+                             f'\n\nSkipping...')
+                    continue
                 style_module = getattr(
                     importlib.import_module(
                         f'picli.actions.styler.{run_config.config[0]["styler"]}'
                     ),
                     f'{util.camelize(run_config.config[0]["styler"])}'
                 )
-                styler = style_module(style_pipe_config, run_config)
-                styler.execute()
+                stylers.append(style_module(style_pipe_config, run_config))
         else:
             LOG.warn("Style step not enabled.\n\nSkipping...")
+        return stylers
 
 
 @click.command()
+@base.changed_since_option
 @click.pass_context
-def style(context):
+def style(context, changed_since):
     config_file = context.obj.get('args')['config']
     debug = context.obj.get('args')['debug']
-    sequence = base.get_sequence('style')
-    for action in sequence:
-        base.execute_subcommand(config_file, action, debug)
+    run_context = RunContext(config_file, debug, changed_since)
+    base.execute_sequence(run_context, base.get_sequence('style'))
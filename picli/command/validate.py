@@ -1,6 +1,6 @@
 import click
 from picli.command import base
-from picli.configs.validate_pipe import ValidatePipeConfig
+from picli.context import RunContext
 from picli import logger
 from picli.actions.validators.validator import Validator
 
@@ -9,17 +9,16 @@ LOG = logger.get_logger(__name__)
 
 class Validate(base.Base):
 
-    def execute(self):
-        self.print_info()
-        validator_config = ValidatePipeConfig(self._base_config, self.debug)
+    def actions(self):
+        validator_config = self._context.pipe_config('validate')
         if self.debug:
             message = f'Debugging run_vars\n\n{validator_config.dump_configs()}'
             LOG.info(message)
         if validator_config.run_pipe:
-            validator = Validator(validator_config)
-            validator.execute()
+            return [Validator(validator_config)]
         else:
             LOG.warn("Validate step not enabled.\n\nSkipping...")
+            return []
 
 
 @click.command()
@@ -27,6 +26,5 @@ class Validate(base.Base):
 def validate(context):
     config_file = context.obj.get('args')['config']
     debug = context.obj.get('args')['debug']
-    sequence = base.get_sequence('validate')
-    for action in sequence:
-        base.execute_subcommand(config_file, action, debug)
+    run_context = RunContext(config_file, debug)
+    base.execute_sequence(run_context, base.get_sequence('validate'))
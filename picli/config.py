@@ -1,5 +1,6 @@
 import os
 
+from picli.discovery.file_index import get_file_index
 from picli.model import base_schema
 from picli import logger
 from picli import util
@@ -37,12 +38,7 @@ class BaseConfig(object):
         :param config: Path to configuration file
         :return: YAML object
         """
-        try:
-            with open(config) as c:
-                return util.safe_load(c)
-        except IOError as e:
-            message = f"Failed to parse config. \n\n{e}"
-            util.sysexit_with_message(message)
+        return util.safe_load_file(config)
 
     def _validate(self):
         """
@@ -115,3 +111,20 @@ class BaseConfig(object):
     @property
     def version(self):
         return self.global_vars['version']
+
+    @property
+    def file_index(self):
+        """
+        Property defining the FileIndex of the base directory.
+        The index is shared by every config built for the same base_dir.
+        The discovery backend is chosen by the optional file_discovery
+        dict inside of global_vars.
+        :return: FileIndex object
+        """
+        file_discovery = self.global_vars.get('file_discovery', {})
+        return get_file_index(
+            self.base_dir,
+            backend=file_discovery.get('backend', 'walk'),
+            untracked=file_discovery.get('untracked', False),
+            workers=file_discovery.get('workers')
+        )
@@ -1,14 +1,15 @@
 import abc
-from itertools import filterfalse
-import os
+import asyncio
 
-from picli.config import BaseConfig
 from picli.configs.run_config import RunConfig
 from picli import logger
+from picli import transport
 from picli import util
 
 LOG = logger.get_logger(__name__)
 
+DEFAULT_CONCURRENCY = 4
+
 
 class BasePipeConfig(object):
     """Abstract Base class for all pipes
@@ -20,13 +21,17 @@ class BasePipeConfig(object):
 
     __metaclass__ = abc.ABCMeta
 
-    def __init__(self, base_config, debug):
+    def __init__(self, context):
         """
-        Builds a BaseConfig object, run configurations,
-        and a pipe_config based on the subclasses' name attr.
-        :param base_config:
+        Builds run configurations and a pipe_config based on the
+        subclasses' name attr from the run's shared configuration.
+        :param context: RunContext object
         """
-        self.base_config = BaseConfig(base_config, debug)
+        self.context = context
+        self.base_config = context.base_config
+        self._dumped_configs = None
+        self._run_vars = None
+        self._shard_semaphore = None
         self.run_config = self._build_run_config()
         self.pipe_config = self._build_pipe_config()
 
@@ -36,71 +41,17 @@ class BasePipeConfig(object):
         Each child class will have its own pi_{self.name}.yml file located in
         {vars_dir}/pipe_vars.d/ which will be read during
         creation of the child class object.
+        When the run has an up to date plan the configuration is taken
+        from the plan instead.
 
         :return: Configuration dictionary for the pipe
         """
-        try:
-            with open(
-                f'{self.base_config.vars_dir}/pipe_vars.d/pi_{self.name}.yml'
-            ) as config:
-                return util.safe_load(config)
-        except IOError as e:
-            message = f"Failed to parse pi_{self.name}.yml. \n\n{e}"
-            util.sysexit_with_message(message)
-
-    def _read_group_vars(self):
-        """
-        Read all files in {base_dir}/piedpiper.d/{vars_dir}/group_vars.d/
-        and returns a list of variable configurations. We first parse all.yml
-        if it exists so that it is the first item in the list. This allows for
-        the other group_vars files to override the values in all.yml
-        :return: list
-        """
-        group_vars_dir = f'{self.base_config.vars_dir}/group_vars.d'
-
-        group_configs = []
-        if os.path.isdir(group_vars_dir):
-            for root, dirs, files in os.walk(
-                    f'{self.base_config.vars_dir}/group_vars.d/'
-            ):
-                if not len(files):
-                    message = f'No group_vars found in {self.base_config.vars_dir}'
-                    util.sysexit_with_message(message)
-                for file in files:
-                    with open(os.path.join(root, file)) as f:
-                        group_config = f.read()
-                        group_configs.append(
-                            {'file': file, 'config': util.safe_load(group_config)}
-                        )
-            return group_configs
-        else:
-            message = f'Failed to read group_vars in {self.base_config.vars_dir}.'
-            util.sysexit_with_message(message)
-
-    def _read_file_vars(self):
-        """
-        Read all files in {base_dir}/piedpiper.d/{vars_dir}/files_vars.d/
-        :return: iterator
-        """
-        if os.path.isdir(f'{self.base_config.vars_dir}/file_vars.d/'):
-            for root, dirs, files in os.walk(
-                    f'{self.base_config.vars_dir}/file_vars.d/'
-            ):
-                for file in files:
-                    if file.endswith(".yml") or file.endswith(".yaml"):
-                        file_name = os.path.join(root, file)
-                        with open(file_name) as f:
-                            file_config = f.read()
-                            yield (file_config, file_name)
-                    else:
-                        message = f"Skipping invalid file_vars.d file " \
-                                  f"{os.path.join(root,file)}"
-                        LOG.debug(message)
-
-        else:
-            message = f"Failed to read file_vars.d in" \
-                      f"{self.base_config.vars_dir}/file_vars.d/."
-            util.sysexit_with_message(message)
+        plan = self.context.plan
+        if plan is not None:
+            return plan.pipe_vars(self.name)
+        return util.safe_load_file(
+            f'{self.base_config.vars_dir}/pipe_vars.d/pi_{self.name}.yml'
+        )
 
     def _build_group_configs(self):
         """
@@ -110,37 +61,33 @@ class BasePipeConfig(object):
         If a file definition exists in file_vars.d/ that also exists
         in a group_vars RunConfig, we overwrite the group_vars RunConfig
         variable with the one found in file_vars.
+        The globs of every group are registered with the file index so
+        that they are resolved together, with a single scan, once the
+        files of any RunConfig are first iterated.
         :return: list
         """
-        group_configs = []
-        for group in self._read_group_vars():
-            for step, config in group['config'].items():
-                if step == f'pi_{self.name}':
-                    run_config = RunConfig(group['file'], config, self.base_config)
-                    for file_definition in run_config.files:
-                        for file, file_name in self._read_file_vars():
-                            file_config = util.safe_load(file)
-                            try:
-                                if file_definition['file'] == file_config['file']:
-                                    file_definition.update(file_config)
-                            except KeyError as e:
-                                message = f'Invalid file_vars config in {file_name}. ' \
-                                          f'\n\nInvalid Key: {e}'
-                                util.sysexit_with_message(message)
-                    group_configs.append(run_config)
-                elif self.name == 'validate':
-                    run_config = RunConfig(group['file'], config, self.base_config)
-                    for file_definition in run_config.files:
-                        for file, file_name in self._read_file_vars():
-                            file_config = util.safe_load(file)
-                            try:
-                                if file_definition['file'] == file_config['file']:
-                                    file_definition.update(file_config)
-                            except KeyError as e:
-                                message = f'Invalid file_vars config in {file_name}.' \
-                                          f'\n\nInvalid Key: {e}'
-                                util.sysexit_with_message(message)
-                    group_configs.append(run_config)
+        group_definitions = [
+            (group['file'], config)
+            for group in self.context.group_vars
+            for step, config in group['config'].items()
+            if step == f'pi_{self.name}' or self.name == 'validate'
+        ]
+        self.file_index.expect(
+            definition['name']
+            for _, config in group_definitions
+            for definition in config
+            if 'name' in definition
+        )
+        group_configs = [
+            RunConfig(
+                group_file,
+                config,
+                self.base_config,
+                self.context.file_vars,
+                self.context.changed_files
+            )
+            for group_file, config in group_definitions
+        ]
         if not len(group_configs):
             message = f'No group configs found for pi_{self.name} in' \
                       f'{self.base_config.vars_dir}/group_vars.d/'
@@ -152,8 +99,13 @@ class BasePipeConfig(object):
         """
         Returns a single merged RunConfig object for further
         steps to use.
+        When the run has an up to date plan the RunConfigs are taken
+        from the plan and group_vars.d isn't read.
         :return: RunConfig object
         """
+        plan = self.context.plan
+        if plan is not None:
+            return plan.run_configs(self.name, self.base_config)
         run_configs = self._build_group_configs()
         run_config = self._merge_run_configs(run_configs)
         return run_config
@@ -163,7 +115,11 @@ class BasePipeConfig(object):
         Merge run configurations into a single RunConfig object which will be used
         by a subcommand's execute function.
 
-        Merge all run_config.files into the first run_config.files object.
+        Files matched by a specific group win over all.yml: every file
+        claimed by another group is left out of the all.yml run configs.
+        The claimed files are collected into a set keyed on the
+        repo-relative path when the all.yml files are first iterated, so
+        the merge is linear in the number of file definitions.
         :param run_configs: List of RunConfig objects build from reading group_vars.d
         :return: RunConfig object
         """
@@ -174,17 +130,17 @@ class BasePipeConfig(object):
             rc_other for rc_other in run_configs
             if rc_other.name != 'all.yml']
         for run_config in default_run_configs:
-            run_config.files[:] = filterfalse(
-                lambda x: x in [
-                    file for rc in other_run_configs
-                    for file in rc.files
-                ], run_config.files)
+            run_config.exclude_files_of(other_run_configs)
         return run_configs
 
     @property
     def debug(self):
         return self.base_config.debug
 
+    @property
+    def file_index(self):
+        return self.base_config.file_index
+
     @property
     @abc.abstractmethod
     def name(self):
@@ -202,7 +158,136 @@ class BasePipeConfig(object):
     def version(self):
         return self.pipe_config[f'pi_{self.name}_pipe_vars']['version']
 
+    @property
+    def timeout(self):
+        """
+        Property defining the connect and read timeouts of requests sent
+        to the pipe's functions. The read timeout never exceeds the
+        action timeout.
+        :return: tuple of seconds
+        """
+        timeout = self.pipe_config[f'pi_{self.name}_pipe_vars'].get('timeout', {})
+        read_timeout = timeout.get('read', transport.READ_TIMEOUT)
+        if self.action_timeout is not None:
+            read_timeout = min(read_timeout, self.action_timeout)
+        return (
+            timeout.get('connect', transport.CONNECT_TIMEOUT),
+            read_timeout
+        )
+
+    @property
+    def action_timeout(self):
+        """
+        Property defining how long a single action of the pipe may take,
+        or None for no limit.
+        :return: seconds or None
+        """
+        timeout = self.pipe_config[f'pi_{self.name}_pipe_vars'].get('timeout', {})
+        return timeout.get('action')
+
+    @property
+    def transport(self):
+        return self.context.transport
+
+    @property
+    def digests(self):
+        return self.context.digests
+
+    @property
+    def concurrency(self):
+        """
+        Property defining how many actions of the pipe are executed at
+        once.
+        :return: int
+        """
+        return self.pipe_config[f'pi_{self.name}_pipe_vars'].get(
+            'concurrency', DEFAULT_CONCURRENCY
+        )
+
+    @property
+    def shard_semaphore(self):
+        """
+        Property defining the semaphore shared by every action of the
+        pipe, which bounds the shards sent to the pipe's functions at
+        once to the pipe's concurrency. A semaphore is bound to the event
+        loop it's used on, so each Engine run gets its own.
+        :return: asyncio.Semaphore
+        """
+        loop = asyncio.get_event_loop()
+        if self._shard_semaphore is None or self._shard_semaphore[0] is not loop:
+            self._shard_semaphore = (loop, asyncio.Semaphore(self.concurrency))
+        return self._shard_semaphore[1]
+
+    @property
+    def sharding(self):
+        """
+        Property defining the largest number of files and bytes sent to
+        a function in one request. An action whose files exceed either
+        limit is split into shards that are sent in parallel.
+        :return: dict with the optional keys files and size
+        """
+        return self.pipe_config[f'pi_{self.name}_pipe_vars'].get('sharding', {})
+
+    @property
+    def content_addressed(self):
+        """
+        Property defining whether files are uploaded with the
+        content-addressed protocol, which only sends the files whose
+        content the function doesn't have yet.
+        :return: bool
+        """
+        return self.pipe_config[f'pi_{self.name}_pipe_vars'].get(
+            'content_addressed', False
+        )
+
+    @property
+    def cache_results(self):
+        """
+        Property defining whether the responses of the pipe's functions
+        are cached locally and replayed for requests that send the same
+        files, file contents and run_vars again.
+        :return: bool
+        """
+        return self.pipe_config[f'pi_{self.name}_pipe_vars'].get(
+            'cache_results', False
+        )
+
+    @property
+    def per_file_results(self):
+        """
+        Property defining whether the pipe's functions are asked for
+        per-file results, which are cached file by file so that only
+        changed files are sent again.
+        :return: bool
+        """
+        return self.pipe_config[f'pi_{self.name}_pipe_vars'].get(
+            'per_file_results', False
+        )
+
     def dump_configs(self):
+        """
+        Dump the merged configuration of the pipe as a run_vars document.
+        The configuration doesn't change once the pipe config is built,
+        so the document is rendered once and reused by every action.
+        :return: str
+        """
+        if self._dumped_configs is None:
+            self._dumped_configs = self._dump_configs()
+        return self._dumped_configs
+
+    @property
+    def run_vars(self):
+        """
+        Property holding the run_vars document of dump_configs parsed
+        back into a dict. It is parsed once and shared by every action of
+        the pipe, so it must not be mutated.
+        :return: dict
+        """
+        if self._run_vars is None:
+            self._run_vars = util.safe_load(self.dump_configs())
+        return self._run_vars
+
+    def _dump_configs(self):
         merged_run_configs = {}
         file_configs = [
             file
@@ -1,36 +1,102 @@
 from picli import logger
 from picli import util
 
-import glob
+from collections.abc import Mapping
 import os
+from types import MappingProxyType
 
 LOG = logger.get_logger(__name__)
 
+_NO_OVERRIDES = MappingProxyType({})
+
+
+class FileDefinition(Mapping):
+    """Compact, read-only file definition
+
+    Behaves like the ``{'file': '/abs/path', **file_vars}`` dict it
+    replaces but only stores the repo-relative path, which is shared
+    with the file index, and a reference to the file's overrides.
+    The absolute path is built when it's read. The overrides are the
+    file's entry in the run's file_vars table, shared by every
+    definition of the file and never mutated; files without file_vars
+    share one empty mapping.
+    """
+
+    __slots__ = ('base_dir', 'path', 'overrides')
+
+    def __init__(self, base_dir, path, overrides=None):
+        self.base_dir = base_dir
+        self.path = path
+        self.overrides = overrides or _NO_OVERRIDES
+
+    @property
+    def file(self):
+        return os.path.join(self.base_dir, self.path)
+
+    def __getitem__(self, key):
+        if key == 'file':
+            return self.file
+        return self.overrides[key]
+
+    def __iter__(self):
+        yield 'file'
+        yield from self.overrides
+
+    def __len__(self):
+        return len(self.overrides) + 1
+
+    def __repr__(self):
+        return f'FileDefinition({dict(self)!r})'
+
+
+class FileDefinitions(object):
+    """Lazy, re-iterable stream of the file definitions of a RunConfig
+
+    Nothing is resolved until the stream is iterated. Every iteration
+    produces the definitions afresh, one at a time, so no per-group or
+    flattened list of definitions is kept alive.
+    """
+
+    def __init__(self, build):
+        self._build = build
+
+    def __iter__(self):
+        return self._build()
+
 
 class RunConfig(object):
 
-    def __init__(self, name, config, base_config):
+    def __init__(self, name, config, base_config, file_vars=None,
+                 changed_files=None):
         self.config = config
         self.name = name
         self.base_config = base_config
-        self.files = self._build_file_definitions()
+        self.file_vars = file_vars or {}
+        self.changed_files = changed_files
+        self.files = FileDefinitions(self._build_file_definitions)
+        self._claimed_by = []
+        self._claimed_files = None
+        self._empty_globs = set()
+        self._validate()
+
+    def _validate(self):
+        for group in self.config:
+            if 'name' not in group:
+                message = "Invalid group_vars file found. \n'name'"
+                util.sysexit_with_message(message)
 
     def _build_file_list(self, group):
         """
         Build a list of files based on the glob pattern given in
         group_vars.d/{pipe}.
-        The glob will be applied to a path relative to the specified
-        vars directory.
-        :return:
-        """
-        try:
-            file_glob = group['name']
-        except KeyError as e:
-            message = f'Invalid group_vars file found. \n{e}'
-            util.sysexit_with_message(message)
-        file_list = \
-            glob.glob(f'{self.base_config.base_dir}/{file_glob}', recursive=True)
-        if not file_list:
+        The glob will be applied to a path relative to the base directory
+        and answered from the base directory's FileIndex.
+        :return: list of repo-relative paths
+        """
+        file_glob = group['name']
+        file_list = self.base_config.file_index.match(file_glob)
+        if not file_list and file_glob not in self._empty_globs:
+            self._empty_globs.add(file_glob)
             message = \
                 f'File Glob {file_glob} returned nothing ' \
                 f'in {self.base_config.base_dir}'
@@ -38,23 +104,52 @@ class RunConfig(object):
 
         return file_list
 
-    def _build_file_definitions(self):
-        file_definitions = []
-        for config in self.config:
-            file_list = self._build_file_list(config)
-            file_definition_list = []
-            for file in file_list:
-                if os.path.isdir(file):
+    def exclude_files_of(self, run_configs):
+        """
+        Leave out every file that is also part of one of run_configs.
+        The excluded files are only resolved once the files of this
+        RunConfig are first iterated.
+        :param run_configs: list of RunConfig objects
+        :return: None
+        """
+        self._claimed_by = list(run_configs)
+        self._claimed_files = None
+
+    def paths(self):
+        """
+        Yield the repo-relative path of every file of the RunConfig.
+        When the run is restricted to changed files, files that didn't
+        change are left out.
+        :return: iterator
+        """
+        if self._claimed_files is None:
+            self._claimed_files = {
+                path
+                for run_config in self._claimed_by
+                for path in run_config.paths()
+            }
+        changed_files = self.changed_files
+        for group in self.config:
+            for path in self._build_file_list(group):
+                if path in self._claimed_files:
                     continue
-                file_definition = {
-                    'file': file,
-                }
-                file_definition_list.append(file_definition)
-
-            file_definitions.append(file_definition_list)
-
-        return [
-            definition
-            for element in file_definitions
-            for definition in element
-        ]
+                if changed_files is None or path in changed_files:
+                    yield path
+
+    def is_empty(self):
+        """
+        Whether the RunConfig has no files at all.
+        :return: bool
+        """
+        return next(iter(self.paths()), None) is None
+
+    def _build_file_definitions(self):
+        """
+        Yield a FileDefinition for every file of the RunConfig with its
+        file_vars overrides applied.
+        :return: iterator
+        """
+        base_dir = self.base_config.base_dir
+        file_vars = self.file_vars
+        for path in self.paths():
+            yield FileDefinition(base_dir, path, file_vars.get(path))
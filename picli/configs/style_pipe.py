@@ -16,21 +16,20 @@ class StylePipeConfig(BasePipeConfig):
     all required properties and files needed by a styler
     to execute a style step. The Style PipeConfig object will
     do the following:
-    Build a BaseConfig object using the file specified
-    during initialization.
+    Use the BaseConfig object of the run's RunContext.
     Build a run configuration which contains a list of
     files definitions.
     Read the stylepipe configuration file located in
     {base_dir}/piedpiper.d/{vars_dir}/pipe_vars.d/pi_style.yml
     """
 
-    def __init__(self, base_config, debug):
+    def __init__(self, context):
         """
-        Call the superclass init to build BaseConfig object,
-        pipe_configs, and run_configs, then validate.
-        :param base_config:
+        Call the superclass init to build pipe_configs
+        and run_configs, then validate.
+        :param context: RunContext object
         """
-        super(StylePipeConfig, self).__init__(base_config, debug)
+        super(StylePipeConfig, self).__init__(context)
         self._validate()
 
     @property
@@ -4,9 +4,9 @@ from picli.model import validate_pipeconfig_schema
 from picli import logger
 from picli import util
 
-import importlib
 from functools import reduce
 import operator
+import pkgutil
 
 LOG = logger.get_logger(__name__)
 
@@ -20,13 +20,13 @@ class ValidatePipeConfig(BasePipeConfig):
     Subclasses BasePipeConfig.
     """
 
-    def __init__(self, base_config, debug):
+    def __init__(self, context):
         """
         Initialize a ValidatePipeConfig object and returns None.
-        :param base_config:
+        :param context: RunContext object
         """
-        super(ValidatePipeConfig, self).__init__(base_config, debug)
-        self.pipe_configs = self._build_pipe_configs(base_config, debug)
+        super(ValidatePipeConfig, self).__init__(context)
+        self.pipe_configs = self._build_pipe_configs()
         self._validate()
 
     @property
@@ -68,26 +68,25 @@ class ValidatePipeConfig(BasePipeConfig):
                 util.safe_load_file(self.base_config.ci_provider_file)
         }
 
-    def _build_pipe_configs(self, base_config, debug):
+    def _build_pipe_configs(self):
         """
         Builds a list of PipeConfig objects based on
-        the contents of the picli.configs package directory so
+        the modules of the picli.configs package directory so
         that we can dump their configurations for the validation
         function to use.
         We ignore the validate and base PipeConfig classes
         because we already have those instantiated.
-        :param base_config:
+        The PipeConfig objects come from the RunContext so that later
+        steps of the run reuse them instead of resolving them again.
         :return: iterator
         """
         pipe_configs = []
-        pipes = [pipe for pipe in dir(configs)
+        pipes = [pipe for _, pipe, _ in pkgutil.iter_modules(configs.__path__)
                  if "_pipe" in pipe and
                  "validate" not in pipe and
                  "base" not in pipe]
         for pipe in pipes:
-            pipe_config_module = getattr(importlib.import_module(f'picli.configs.{pipe}'),
-                                         f'{util.camelize(pipe)}Config')
-            pipe_config = pipe_config_module(base_config, debug)
+            pipe_config = self.context.pipe_config(pipe[:-len('_pipe')])
             pipe_configs.append(pipe_config)
 
         return pipe_configs
@@ -0,0 +1,237 @@
+import importlib
+import os
+
+from picli.config import BaseConfig
+from picli.discovery.digest import DigestEngine
+from picli.discovery import git
+from picli import logger
+from picli import routing
+from picli.transport import Transport
+from picli import util
+
+LOG = logger.get_logger(__name__)
+
+
+class RunContext(object):
+    """Configuration shared by every step of a single PiCli run
+
+    A RunContext loads pi_global_vars.yml and the contents of
+    piedpiper.d once and resolves each pipe configuration at most once,
+    so that a sequence such as lint hands the same resolved pipe configs
+    to validate, style and sast instead of rebuilding them per step.
+    """
+
+    def __init__(self, config, debug, changed_since=None, use_plan=True):
+        """
+        Build the BaseConfig object for the run.
+        :param config: pi_global_vars configuration file
+        :param debug: boolean
+        :param changed_since: git revision. When set, pipes only run on
+                              the files changed between it and the work
+                              tree.
+        :param use_plan: Whether pipe configs are loaded from an up to
+                         date plan written by ``picli plan``
+        """
+        self.config = config
+        self.debug = debug
+        self.changed_since = changed_since
+        self.base_config = BaseConfig(config, debug)
+        self._group_vars = None
+        self._file_vars = None
+        self._changed_files = None
+        self._digests = None
+        self._transport = None
+        self._pipe_configs = {}
+        self._plan = None
+        self._plan_loaded = not use_plan
+
+    @property
+    def file_index(self):
+        return self.base_config.file_index
+
+    @property
+    def digests(self):
+        """
+        Property defining the DigestEngine shared by every pipe and
+        action of the run.
+        :return: DigestEngine object
+        """
+        if self._digests is None:
+            self._digests = DigestEngine(
+                self.base_config.base_dir, debug=self.debug
+            )
+        return self._digests
+
+    @property
+    def transport(self):
+        """
+        Property defining the Transport shared by every action of the run.
+        :return: Transport object
+        """
+        if self._transport is None:
+            self._transport = Transport()
+        return self._transport
+
+    def close(self):
+        """
+        Close the connections the run's Transport kept alive across its
+        stages.
+        :return: None
+        """
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    @property
+    def group_vars(self):
+        """
+        Property defining the parsed contents of group_vars.d.
+        :return: list
+        """
+        if self._group_vars is None:
+            self._group_vars = self._read_group_vars()
+        return self._group_vars
+
+    @property
+    def file_vars(self):
+        """
+        Property defining the file_vars.d override table.
+        :return: dict
+        """
+        if self._file_vars is None:
+            self._file_vars = self._build_file_vars()
+        return self._file_vars
+
+    @property
+    def changed_files(self):
+        """
+        Property defining the repo-relative paths of the files changed
+        since the changed_since revision, or None when every file is in
+        scope.
+        :return: set or None
+        """
+        if self.changed_since is None:
+            return None
+        if self._changed_files is None:
+            try:
+                self._changed_files = git.changed_files(
+                    self.base_config.base_dir, self.changed_since
+                )
+            except git.GitError as e:
+                message = f'Unable to list files changed since ' \
+                          f'{self.changed_since}.\n\n{e}'
+                util.sysexit_with_message(message)
+            LOG.info(f'{len(self._changed_files)} files changed since '
+                     f'{self.changed_since}')
+        return self._changed_files
+
+    @property
+    def plan_file(self):
+        return os.path.join(self.base_config.base_dir, routing.PLAN_FILE)
+
+    @property
+    def plan(self):
+        """
+        Property defining the RoutingPlan of the run, or None when there
+        is no plan or it is stale and configuration must be resolved.
+        :return: RoutingPlan object or None
+        """
+        if not self._plan_loaded:
+            self._plan_loaded = True
+            plan = routing.RoutingPlan.load(self.plan_file)
+            if plan is not None:
+                if plan.fingerprint == routing.fingerprint(self):
+                    LOG.info(f'Using plan {self.plan_file}')
+                    self._plan = plan
+                else:
+                    LOG.warn(f'Plan {self.plan_file} is stale, '
+                             f'resolving configuration.')
+        return self._plan
+
+    def pipe_config(self, name):
+        """
+        Return the PipeConfig object for the named pipe, building it
+        the first time it is requested.
+        :param name: Name of the pipe, e.g. style
+        :return: PipeConfig object
+        """
+        if name not in self._pipe_configs:
+            pipe_config_class = getattr(
+                importlib.import_module(f'picli.configs.{name}_pipe'),
+                f'{util.camelize(name)}PipeConfig'
+            )
+            self._pipe_configs[name] = pipe_config_class(self)
+        return self._pipe_configs[name]
+
+    def _read_group_vars(self):
+        """
+        Read all files in {base_dir}/piedpiper.d/{vars_dir}/group_vars.d/
+        and returns a list of variable configurations. We first parse all.yml
+        if it exists so that it is the first item in the list. This allows for
+        the other group_vars files to override the values in all.yml
+        :return: list
+        """
+        group_vars_dir = f'{self.base_config.vars_dir}/group_vars.d'
+
+        group_configs = []
+        if os.path.isdir(group_vars_dir):
+            for root, dirs, files in os.walk(
+                    f'{self.base_config.vars_dir}/group_vars.d/'
+            ):
+                if not len(files):
+                    message = f'No group_vars found in {self.base_config.vars_dir}'
+                    util.sysexit_with_message(message)
+                for file in files:
+                    group_config = util.safe_load_file(os.path.join(root, file))
+                    group_configs.append(
+                        {'file': file, 'config': group_config}
+                    )
+            return group_configs
+        else:
+            message = f'Failed to read group_vars in {self.base_config.vars_dir}.'
+            util.sysexit_with_message(message)
+
+    def _read_file_vars(self):
+        """
+        Read all files in {base_dir}/piedpiper.d/{vars_dir}/files_vars.d/
+        :return: iterator
+        """
+        if os.path.isdir(f'{self.base_config.vars_dir}/file_vars.d/'):
+            for root, dirs, files in os.walk(
+                    f'{self.base_config.vars_dir}/file_vars.d/'
+            ):
+                for file in files:
+                    if file.endswith(".yml") or file.endswith(".yaml"):
+                        file_name = os.path.join(root, file)
+                        yield (util.safe_load_file(file_name), file_name)
+                    else:
+                        message = f"Skipping invalid file_vars.d file " \
+                                  f"{os.path.join(root,file)}"
+                        LOG.debug(message)
+
+        else:
+            message = f"Failed to read file_vars.d in" \
+                      f"{self.base_config.vars_dir}/file_vars.d/."
+            util.sysexit_with_message(message)
+
+    def _build_file_vars(self):
+        """
+        Parse every file in file_vars.d once and build a table of file
+        overrides keyed by the normalized repo-relative path of the file
+        they apply to. The overrides of documents naming the same file
+        are merged, later documents taking precedence.
+        :return: dict
+        """
+        file_vars = {}
+        for file_config, file_name in self._read_file_vars():
+            try:
+                path = self.file_index.relative_path(file_config['file'])
+            except KeyError as e:
+                message = f'Invalid file_vars config in {file_name}. ' \
+                          f'\n\nInvalid Key: {e}'
+                util.sysexit_with_message(message)
+            file_vars.setdefault(path, {}).update({
+                key: value for key, value in file_config.items()
+                if key != 'file'
+            })
+        return file_vars
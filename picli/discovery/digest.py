@@ -0,0 +1,244 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import mmap
+import os
+import threading
+import time
+
+from picli.cache.digest_cache import get_digest_cache
+from picli import logger
+
+LOG = logger.get_logger(__name__)
+
+ALGORITHM = 'sha256'
+_BUFFER_SIZE = 1024 * 1024
+_MMAP_THRESHOLD = 4 * 1024 * 1024
+
+FileDigest = namedtuple('FileDigest', 'digest size mode')
+
+
+def hash_file(path, algorithm=ALGORITHM):
+    """
+    Hash the content of a single file.
+    Large files are mapped into memory and hashed in one call, smaller
+    ones are read with large buffered reads. hashlib releases the GIL
+    while hashing, so several files can be hashed concurrently.
+    :param path: Path to the file
+    :param algorithm: Name of a hashlib algorithm
+    :return: FileDigest
+    """
+    return _hash_file(path, algorithm)[0]
+
+
+def _hash_file(path, algorithm):
+    """
+    Hash the content of a single file.
+    :param path: Path to the file
+    :param algorithm: Name of a hashlib algorithm
+    :return: tuple of the FileDigest and the os.stat_result of the file
+             taken before it was read
+    """
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb', buffering=0) as file:
+        stat = os.fstat(file.fileno())
+        if stat.st_size >= _MMAP_THRESHOLD:
+            try:
+                with mmap.mmap(
+                        file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    digest.update(mapped)
+                return FileDigest(
+                    digest.hexdigest(), stat.st_size, stat.st_mode
+                ), stat
+            except (OSError, ValueError):
+                digest = hashlib.new(algorithm)
+        elif stat.st_size < _BUFFER_SIZE:
+            content = file.read()
+            digest.update(content)
+            return FileDigest(
+                digest.hexdigest(), len(content), stat.st_mode
+            ), stat
+        buffer = bytearray(_BUFFER_SIZE)
+        view = memoryview(buffer)
+        size = 0
+        read = file.readinto(buffer)
+        while read:
+            digest.update(view[:read])
+            size += read
+            read = file.readinto(buffer)
+    return FileDigest(digest.hexdigest(), size, stat.st_mode), stat
+
+
+def _stat_key(stat):
+    return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+class DigestEngine(object):
+    """Content digests of the files of a base directory
+
+    Files are hashed by a bounded thread pool the first time their
+    digest is requested and every digest is remembered for the lifetime
+    of the engine. A RunContext owns a single engine, so each file is
+    hashed at most once per run no matter how many pipes and actions
+    ask for it, including requests made concurrently from several
+    threads: a file already being hashed for another request is waited
+    for instead of being hashed again.
+    Digests are also kept across runs in the DigestCache, keyed by the
+    stat of each file, so files that didn't change since a previous run
+    are only stat'ed.
+    """
+
+    def __init__(self, base_dir, workers=None, debug=False,
+                 algorithm=ALGORITHM, use_cache=True):
+        self.base_dir = base_dir
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self.debug = debug
+        self.algorithm = algorithm
+        self.use_cache = use_cache
+        self._digests = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def manifest(self, paths):
+        """
+        Return the digest, size and mode of every file in paths, hashing
+        the files that weren't hashed yet.
+        Files that can't be read are left out of the manifest.
+        :param paths: iterable of repo-relative paths
+        :return: dict of path to FileDigest
+        """
+        paths = list(dict.fromkeys(paths))
+        started = time.perf_counter()
+        hashed = threading.Event()
+        with self._lock:
+            pending = [
+                path for path in paths
+                if path not in self._digests and path not in self._in_flight
+            ]
+            waiting = {
+                self._in_flight[path] for path in paths
+                if path in self._in_flight
+            }
+            for path in pending:
+                self._in_flight[path] = hashed
+        read = []
+        try:
+            if pending:
+                read = self._hash(pending)
+        finally:
+            with self._lock:
+                for path in pending:
+                    self._digests.setdefault(path, None)
+                    del self._in_flight[path]
+            hashed.set()
+        for event in waiting:
+            event.wait()
+
+        digests = self._digests
+        manifest = {
+            path: digests[path] for path in paths
+            if digests[path] is not None
+        }
+        if pending:
+            self._report(
+                pending, read, manifest, time.perf_counter() - started
+            )
+        return manifest
+
+    def _hash(self, paths):
+        """
+        Hash paths, answering files whose stat is unchanged from the
+        digest cache and reading the others on the thread pool.
+        :param paths: list of repo-relative paths
+        :return: list of the paths that were read
+        """
+        cache = get_digest_cache(self.algorithm) if self.use_cache else None
+        if cache is None:
+            self._parallel(self._read, paths)
+            return paths
+
+        stats = {}
+
+        def stat_file(path):
+            try:
+                stats[path] = os.stat(os.path.join(self.base_dir, path))
+            except OSError as e:
+                LOG.warn(f'Unable to hash {path}. {e}')
+
+        self._parallel(stat_file, paths)
+        cached = cache.get_many(_stat_key(stat) for stat in stats.values())
+        misses = []
+        for path, stat in stats.items():
+            digest = cached.get(_stat_key(stat))
+            if digest is None:
+                misses.append(path)
+            else:
+                self._digests[path] = FileDigest(
+                    digest, stat.st_size, stat.st_mode
+                )
+        read = self._parallel(self._read, misses)
+        cache.set_many(
+            (_stat_key(stat), self._digests[path].digest)
+            for path, stat in read
+        )
+        return misses
+
+    def _read(self, path):
+        """
+        Read and hash a single file.
+        :param path: repo-relative path
+        :return: tuple of path and the os.stat_result the digest belongs
+                 to, or None if the file can't be read
+        """
+        try:
+            self._digests[path], stat = _hash_file(
+                os.path.join(self.base_dir, path), self.algorithm
+            )
+        except OSError as e:
+            LOG.warn(f'Unable to hash {path}. {e}')
+            return None
+        return path, stat
+
+    def _parallel(self, function, items):
+        """
+        Call function on every item on the thread pool. Each worker
+        takes the next item from a shared iterator until every item is
+        done.
+        :param function: Function of one item
+        :param items: list
+        :return: list of the results that aren't None, in no order
+        """
+        if not items:
+            return []
+        remaining = iter(items)
+        next_lock = threading.Lock()
+        results = []
+
+        def work():
+            while True:
+                with next_lock:
+                    item = next(remaining, None)
+                if item is None:
+                    return
+                result = function(item)
+                if result is not None:
+                    results.append(result)
+
+        workers = min(self.workers, len(items))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(work) for _ in range(workers)]:
+                future.result()
+        return results
+
+    def _report(self, hashed, read, manifest, elapsed):
+        size = sum(
+            manifest[path].size for path in read if path in manifest
+        )
+        message = f'Hashed {len(hashed)} files in {elapsed:.3f}s, ' \
+                  f'{len(read)} read, {size / 2 ** 20:.1f}MiB ' \
+                  f'({size / 2 ** 20 / max(elapsed, 1e-9):.1f}MiB/s, ' \
+                  f'{self.workers} threads)'
+        if self.debug:
+            LOG.info(message)
+        else:
+            LOG.debug(message)
@@ -0,0 +1,371 @@
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+import hashlib
+import marshal
+import os
+import tempfile
+import threading
+import time
+
+from picli.cache import cache_dir
+from picli.discovery import git
+from picli.discovery.ignore import ALWAYS_IGNORED
+from picli.discovery.ignore import IGNORE_FILES
+from picli.discovery.ignore import IgnoreRules
+from picli.discovery.ignore import filter_paths
+from picli.discovery.matcher import PatternMatcher
+from picli import logger
+
+LOG = logger.get_logger(__name__)
+
+_CACHE_VERSION = 2
+_RACY_WINDOW_NS = 2 * 10 ** 9
+
+_file_indexes = {}
+
+
+def get_file_index(base_dir, backend='walk', untracked=False, workers=None):
+    """
+    Return the file index for base_dir.
+
+    Indexes are shared for the lifetime of the process so that every
+    pipe and every group_vars pattern in a run is answered from a
+    single walk of the tree.
+    :param base_dir: Directory to index
+    :param backend: 'walk' to walk the filesystem or 'git' to list the
+                    files tracked by git
+    :param untracked: Whether the git backend lists untracked files
+    :param workers: Number of threads walking the filesystem
+    :return: FileIndex object
+    """
+    base_dir = os.path.normpath(os.path.abspath(base_dir))
+    key = (base_dir, backend, untracked, workers)
+    if key not in _file_indexes:
+        if backend == 'git':
+            _file_indexes[key] = GitFileIndex(base_dir, untracked, workers)
+        else:
+            _file_indexes[key] = FileIndex(base_dir, workers)
+    return _file_indexes[key]
+
+
+class FileIndex(object):
+    """In-memory index of every file below a base directory
+
+    The tree is walked once, the first time it is needed, and every
+    glob pattern is then evaluated against the stored list of
+    repo-relative paths instead of going back to the filesystem.
+    Patterns follow the semantics of ``glob.glob(recursive=True)``:
+    ``**`` matches any number of directories and wildcards never
+    match names starting with a dot unless the pattern does.
+    Symlinked directories are not descended into, .git is never
+    entered and subtrees excluded by a .gitignore or .piedpiperignore
+    file are pruned while walking.
+
+    The listing of every directory is persisted in PiCli's cache
+    directory together with the directory's mtime. Like git's index,
+    later runs only stat each directory and re-scan the ones whose
+    mtime changed.
+    """
+
+    def __init__(self, base_dir, workers=None):
+        self.base_dir = base_dir
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+        self._files = None
+        self._matches = {}
+        self._expected = {}
+        self._lock = threading.RLock()
+
+    @property
+    def files(self):
+        """
+        Sorted list of repo-relative paths of every file in the index.
+        :return: list
+        """
+        with self._lock:
+            if self._files is None:
+                self._files = self._walk()
+        return self._files
+
+    @property
+    def _cache_file(self):
+        directory = cache_dir('file_index')
+        if directory:
+            key = hashlib.sha1(self.base_dir.encode()).hexdigest()
+            return os.path.join(directory, f'{key}.marshal')
+
+    def _walk(self):
+        """
+        Walk base_dir and collect every non-directory entry, reusing the
+        cached listing of every directory whose mtime and ignore files
+        are unchanged. Ignored directories are pruned during the walk.
+        Directories are visited concurrently by a bounded thread pool,
+        which hides the latency of stat and readdir calls on network
+        filesystems.
+        :return: list
+        """
+        started = time.time_ns()
+        cached = self._load()
+        cached_directories = cached.get('directories', {})
+        directories = {}
+        scanned = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = {executor.submit(
+                self._visit, '', IgnoreRules(), False, cached_directories
+            )}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    visited = future.result()
+                    if visited is None:
+                        continue
+                    rel_dir, listing, rules, rescan, rescanned = visited
+                    directories[rel_dir] = listing
+                    scanned += rescanned
+                    pending.update(
+                        executor.submit(
+                            self._visit,
+                            f'{rel_dir}/{name}' if rel_dir else name,
+                            rules,
+                            rescan,
+                            cached_directories
+                        )
+                        for name in listing[1]
+                    )
+
+        if not scanned and directories.keys() == cached_directories.keys():
+            return cached['files']
+        files = sorted(
+            f'{rel_dir}/{name}' if rel_dir else name
+            for rel_dir, listing in directories.items()
+            for name in listing[2]
+        )
+        LOG.debug(f'Re-scanned {scanned} of {len(directories)} directories '
+                  f'in {self.base_dir}')
+        self._save(directories, files, started)
+        return files
+
+    def _visit(self, rel_dir, rules, rescan, cached_directories):
+        """
+        Produce the listing of a single directory, from the cache when
+        neither the directory nor its ignore files changed.
+        :param rel_dir: repo-relative directory
+        :param rules: IgnoreRules of the parent directory
+        :param rescan: Whether the cached listing must not be used
+        :param cached_directories: dict of cached directory listings
+        :return: tuple of rel_dir, its listing, its IgnoreRules, whether
+                 its subdirectories must be re-scanned and whether it was
+                 re-scanned, or None if the directory can't be read
+        """
+        try:
+            mtime = os.stat(os.path.join(self.base_dir, rel_dir)).st_mtime_ns
+        except OSError as e:
+            LOG.debug(f'Skipping unreadable directory {rel_dir}. {e}')
+            return None
+        listing = cached_directories.get(rel_dir)
+        if not rescan and listing is not None and listing[0] == mtime:
+            ignore_files = self._stat_ignore_files(rel_dir, listing[3])
+            if ignore_files == listing[3]:
+                rules = rules.for_directory(
+                    self.base_dir, rel_dir, [name for name, _, _ in ignore_files]
+                )
+                return rel_dir, listing, rules, False, False
+            rescan = True
+        listing, rules = self._scan(rel_dir, mtime, rules)
+        return rel_dir, listing, rules, rescan, True
+
+    def _scan(self, rel_dir, mtime, rules):
+        """
+        List a single directory, leaving out .git and every entry
+        excluded by the ignore files of the directory and its parents.
+        :param rel_dir: repo-relative directory
+        :param mtime: mtime of the directory in nanoseconds
+        :param rules: IgnoreRules of the parent directory
+        :return: tuple of the listing and the IgnoreRules of rel_dir.
+                 The listing holds the mtime, subdirectory names, file
+                 names and the stat of the directory's ignore files.
+        """
+        subdirs = []
+        files = []
+        try:
+            with os.scandir(os.path.join(self.base_dir, rel_dir)) as entries:
+                entries = list(entries)
+        except OSError as e:
+            LOG.debug(f'Skipping unreadable directory {rel_dir}. {e}')
+            return (mtime, (), (), ()), rules
+        ignore_files = self._stat_ignore_files(rel_dir, [
+            (entry.name, None, None) for entry in entries
+            if entry.name in IGNORE_FILES
+        ])
+        rules = rules.for_directory(
+            self.base_dir, rel_dir, [name for name, _, _ in ignore_files]
+        )
+        for entry in entries:
+            if entry.name in ALWAYS_IGNORED:
+                continue
+            rel_path = f'{rel_dir}/{entry.name}' if rel_dir else entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if not rules.ignored(rel_path, True):
+                    subdirs.append(entry.name)
+            elif not entry.is_dir():
+                if not rules.ignored(rel_path, False):
+                    files.append(entry.name)
+        return (mtime, tuple(subdirs), tuple(files), ignore_files), rules
+
+    def _stat_ignore_files(self, rel_dir, ignore_files):
+        """
+        Stat the ignore files of a directory.
+        :param rel_dir: repo-relative directory
+        :param ignore_files: iterable of (name, size, mtime) tuples
+        :return: tuple of (name, size, mtime) tuples
+        """
+        stats = []
+        for name, _, _ in ignore_files:
+            try:
+                stat = os.stat(os.path.join(self.base_dir, rel_dir, name))
+            except OSError:
+                continue
+            stats.append((name, stat.st_size, stat.st_mtime_ns))
+        return tuple(sorted(stats))
+
+    def _load(self):
+        """
+        Load the persisted index for base_dir.
+        :return: dict
+        """
+        cache_file = self._cache_file
+        if not cache_file:
+            return {}
+        try:
+            with open(cache_file, 'rb') as index:
+                cached = marshal.loads(index.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return {}
+        if cached.get('version') != _CACHE_VERSION or \
+                cached.get('base_dir') != self.base_dir:
+            return {}
+        return cached
+
+    def _save(self, directories, files, started):
+        """
+        Persist the directory listings of this walk.
+        Directories modified within the mtime granularity of the walk,
+        or whose ignore files were, are stored without an mtime so that
+        the next run re-scans them, since a change made right after they
+        were listed may not have moved their mtime.
+        :param directories: dict of directory listings
+        :param files: sorted list of files
+        :param started: time the walk started in nanoseconds
+        :return: None
+        """
+        cache_file = self._cache_file
+        if not cache_file:
+            return
+        racy = started - _RACY_WINDOW_NS
+        directories = {
+            rel_dir: listing
+            if listing[0] < racy and all(
+                mtime < racy for _, _, mtime in listing[3]
+            ) else (None,) + listing[1:]
+            for rel_dir, listing in directories.items()
+        }
+        cached = {
+            'version': _CACHE_VERSION,
+            'base_dir': self.base_dir,
+            'directories': directories,
+            'files': files,
+        }
+        try:
+            with tempfile.NamedTemporaryFile(
+                    dir=os.path.dirname(cache_file), delete=False) as index:
+                index.write(marshal.dumps(cached))
+            os.replace(index.name, cache_file)
+        except OSError as e:
+            LOG.debug(f'Failed to save file index for {self.base_dir}. {e}')
+
+    def relative_path(self, path):
+        """
+        Normalize an absolute or base_dir-relative path into the
+        repo-relative form used as the key of the index.
+        :param path: file path
+        :return: str
+        """
+        prefix = self.base_dir + os.sep
+        if path.startswith(prefix):
+            return path[len(prefix):]
+        if os.path.isabs(path):
+            path = os.path.relpath(path, self.base_dir)
+        return os.path.normpath(path).replace(os.sep, '/')
+
+    def expect(self, patterns):
+        """
+        Register patterns that are going to be matched so that they are
+        resolved together, in a single scan of the index, the first time
+        any pattern is matched.
+        :param patterns: iterable of glob patterns relative to base_dir
+        :return: None
+        """
+        with self._lock:
+            self._expected.update(
+                (pattern, None) for pattern in patterns
+                if pattern not in self._matches
+            )
+
+    def match(self, pattern):
+        """
+        Return the repo-relative path of every indexed file matching
+        pattern. The returned list is shared and must not be modified.
+        :param pattern: glob pattern relative to base_dir
+        :return: list
+        """
+        if pattern not in self._matches:
+            self.match_many([pattern])
+        return self._matches[pattern]
+
+    def match_many(self, patterns):
+        """
+        Resolve several patterns, and every expected pattern, with one
+        scan of the index.
+        All patterns are compiled into a single PatternMatcher and every
+        indexed path is assigned to each pattern it matches. Results are
+        remembered so later calls to match are answered without a scan.
+        :param patterns: iterable of glob patterns relative to base_dir
+        :return: list of repo-relative path lists, one per pattern
+        """
+        patterns = list(patterns)
+        with self._lock:
+            self.expect(patterns)
+            pending = list(self._expected)
+            self._expected.clear()
+            if pending:
+                matcher = PatternMatcher(pending)
+                for pattern, files in zip(
+                        pending, matcher.match_all(self.files)):
+                    self._matches[pattern] = files
+        return [self._matches[pattern] for pattern in patterns]
+
+
+class GitFileIndex(FileIndex):
+    """File index built from ``git ls-files``
+
+    Lists the files tracked by git, and optionally the untracked files
+    that aren't ignored, instead of walking the filesystem. This is
+    what CI actually builds and is much faster than a walk on large
+    checkouts. .piedpiperignore files are applied to the listing.
+    Falls back to walking the filesystem when base_dir isn't inside a
+    git work tree or git isn't installed.
+    """
+
+    def __init__(self, base_dir, untracked=False, workers=None):
+        super(GitFileIndex, self).__init__(base_dir, workers)
+        self.untracked = untracked
+
+    def _walk(self):
+        try:
+            files = git.ls_files(self.base_dir, self.untracked)
+        except git.GitError as e:
+            message = f'Unable to list files with git in {self.base_dir}, ' \
+                      f'walking the filesystem instead.\n\n{e}'
+            LOG.warn(message)
+            return super(GitFileIndex, self)._walk()
+        return filter_paths(self.base_dir, files, ('.piedpiperignore',))
@@ -0,0 +1,79 @@
+import subprocess
+
+from picli import logger
+
+LOG = logger.get_logger(__name__)
+
+
+class GitError(Exception):
+    """Raised when git is unavailable or the directory isn't a work tree"""
+
+
+def git(base_dir, *args):
+    """
+    Run a git command in base_dir and return its raw output.
+    :param base_dir: Directory to run git in
+    :param args: git arguments
+    :return: bytes
+    """
+    try:
+        result = subprocess.run(
+            ['git', '-C', base_dir] + list(args),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+    except OSError as e:
+        raise GitError(f'Unable to run git. {e}')
+    if result.returncode:
+        raise GitError(result.stderr.decode(errors='replace').strip())
+    return result.stdout
+
+
+def _paths(output):
+    return [
+        path.decode('utf-8', 'surrogateescape')
+        for path in output.split(b'\0') if path
+    ]
+
+
+def ls_files(base_dir, untracked=False):
+    """
+    List the files git knows about below base_dir.
+    Paths are relative to base_dir. Submodules and tracked files that
+    were deleted from the work tree are left out.
+    :param base_dir: Directory inside a git work tree
+    :param untracked: Also list untracked files that aren't ignored
+    :return: sorted list of paths
+    """
+    files = set()
+    for entry in git(base_dir, 'ls-files', '-z', '--stage').split(b'\0'):
+        if not entry:
+            continue
+        info, path = entry.split(b'\t', 1)
+        if not info.startswith(b'160000'):
+            files.add(path.decode('utf-8', 'surrogateescape'))
+    files.difference_update(_paths(git(base_dir, 'ls-files', '-z', '--deleted')))
+    if untracked:
+        files.update(_paths(git(
+            base_dir, 'ls-files', '-z', '--others', '--exclude-standard'
+        )))
+    return sorted(files)
+
+
+def changed_files(base_dir, ref):
+    """
+    List the files below base_dir that differ between ref and the work
+    tree, including untracked files that aren't ignored.
+    Paths are relative to base_dir. Deleted files are left out.
+    :param base_dir: Directory inside a git work tree
+    :param ref: Any git revision, e.g. origin/master
+    :return: set of paths
+    """
+    files = set(_paths(git(
+        base_dir, 'diff', '-z', '--name-only', '--relative',
+        '--diff-filter=d', ref, '--'
+    )))
+    files.update(_paths(git(
+        base_dir, 'ls-files', '-z', '--others', '--exclude-standard'
+    )))
+    return files
@@ -0,0 +1,221 @@
+import os
+import re
+
+from picli import logger
+
+LOG = logger.get_logger(__name__)
+
+IGNORE_FILES = ('.gitignore', '.piedpiperignore')
+ALWAYS_IGNORED = ('.git',)
+
+
+class IgnoreRules(object):
+    """Stack of gitignore-style rules in effect for a directory
+
+    Each directory with a .gitignore or .piedpiperignore file pushes a
+    new level onto the rules of its parent. Rules are evaluated like
+    git does: patterns are relative to the directory of the file they
+    come from, deeper files take precedence over shallower ones and the
+    last matching pattern of a file wins, so ``!pattern`` re-includes
+    what an earlier pattern excluded. As the walk never enters ignored
+    directories, nothing below them can be re-included.
+    """
+
+    def __init__(self, levels=()):
+        self.levels = levels
+
+    def for_directory(self, base_dir, rel_dir, names):
+        """
+        Return the rules in effect inside rel_dir.
+        :param base_dir: Root of the walk
+        :param rel_dir: repo-relative directory
+        :param names: Names of the ignore files present in rel_dir
+        :return: IgnoreRules object
+        """
+        patterns = []
+        for name in names:
+            path = os.path.join(base_dir, rel_dir, name)
+            try:
+                with open(path, encoding='utf-8', errors='replace') as ignore_file:
+                    patterns.extend(ignore_file.read().splitlines())
+            except OSError as e:
+                LOG.debug(f'Failed to read {path}. {e}')
+        level = _Level(rel_dir, patterns)
+        if not level.rules:
+            return self
+        return IgnoreRules(self.levels + (level,))
+
+    def ignored(self, rel_path, is_dir):
+        """
+        Whether rel_path is excluded by the rules.
+        :param rel_path: repo-relative path
+        :param is_dir: whether rel_path is a directory
+        :return: bool
+        """
+        for level in reversed(self.levels):
+            ignored = level.match(rel_path, is_dir)
+            if ignored is not None:
+                return ignored
+        return False
+
+
+class _Level(object):
+    """The rules of a single ignore file directory"""
+
+    def __init__(self, rel_dir, patterns):
+        self.prefix = f'{rel_dir}/' if rel_dir else ''
+        self.rules = [rule for rule in map(_Rule.parse, patterns) if rule]
+        self._any_rule = _combine(self.rules)
+        self._any_file_rule = _combine(
+            [rule for rule in self.rules if not rule.directory_only]
+        )
+
+    def match(self, rel_path, is_dir):
+        """
+        :return: True if ignored, False if re-included, None if no rule
+                 of this level matches
+        """
+        path = rel_path[len(self.prefix):]
+        any_rule = self._any_rule if is_dir else self._any_file_rule
+        if any_rule is None or not any_rule.match(path):
+            return None
+        for rule in reversed(self.rules):
+            if rule.directory_only and not is_dir:
+                continue
+            if rule.regex.match(path):
+                return not rule.negated
+        return None
+
+
+class _Rule(object):
+
+    def __init__(self, regex, negated, directory_only):
+        self.regex = regex
+        self.negated = negated
+        self.directory_only = directory_only
+
+    @classmethod
+    def parse(cls, line):
+        """
+        Parse a single line of an ignore file.
+        :param line: line of an ignore file
+        :return: _Rule or None for blank lines and comments
+        """
+        if not line.endswith('\\ '):
+            line = line.rstrip()
+        if not line or line.startswith('#'):
+            return None
+        negated = line.startswith('!')
+        if negated:
+            line = line[1:]
+        elif line.startswith('\\!') or line.startswith('\\#'):
+            line = line[1:]
+        directory_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            return None
+        anchored = '/' in line
+        line = line.lstrip('/')
+        pattern = _translate(line)
+        if not anchored:
+            pattern = f'(?:.*/)?{pattern}'
+        return cls(re.compile(pattern + r'\Z', re.DOTALL), negated, directory_only)
+
+
+def _combine(rules):
+    if rules:
+        return re.compile(
+            '|'.join(f'(?:{rule.regex.pattern})' for rule in rules), re.DOTALL
+        )
+
+
+def _translate(pattern):
+    """
+    Translate a gitignore pattern into a regular expression.
+    Unlike glob, wildcards in ignore files also match dotfiles.
+    :param pattern: gitignore pattern without negation or trailing slash
+    :return: str
+    """
+    regex = ''
+    i, n = 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        i += 1
+        if char == '*':
+            start = i - 1
+            while i < n and pattern[i] == '*':
+                i += 1
+            leading = start == 0 or pattern[start - 1] == '/'
+            if i - start > 1 and leading and i < n and pattern[i] == '/':
+                regex += '(?:.*/)?'
+                i += 1
+            elif i - start > 1 and leading and i >= n:
+                regex += '.*'
+            else:
+                regex += '[^/]*'
+        elif char == '?':
+            regex += '[^/]'
+        elif char == '\\' and i < n:
+            regex += re.escape(pattern[i])
+            i += 1
+        elif char == '[':
+            j = i
+            if j < n and pattern[j] in '!^':
+                j += 1
+            if j < n and pattern[j] == ']':
+                j += 1
+            while j < n and pattern[j] != ']':
+                j += 1
+            if j >= n:
+                regex += r'\['
+            else:
+                chars = pattern[i:j].replace('\\', r'\\')
+                i = j + 1
+                if chars[0] in '!^':
+                    chars = '^/' + chars[1:]
+                regex += f'[{chars}]'
+        else:
+            regex += re.escape(char)
+    return regex
+
+
+def filter_paths(base_dir, paths, ignore_files=IGNORE_FILES):
+    """
+    Remove the paths excluded by ignore files from an existing listing,
+    for discovery backends which don't walk the tree themselves.
+    Only ignore files that appear in the listing are read.
+    :param base_dir: Root of the listing
+    :param paths: sorted list of repo-relative paths
+    :param ignore_files: Names of the ignore files to honor
+    :return: list
+    """
+    directories_with_rules = {}
+    for path in paths:
+        rel_dir, _, name = path.rpartition('/')
+        if name in ignore_files:
+            directories_with_rules.setdefault(rel_dir, []).append(name)
+    if not directories_with_rules:
+        return paths
+
+    directories = {'': (False, IgnoreRules().for_directory(
+        base_dir, '', directories_with_rules.get('', ())
+    ))}
+
+    def directory(rel_dir):
+        if rel_dir not in directories:
+            parent, _, _ = rel_dir.rpartition('/')
+            ignored, rules = directory(parent)
+            ignored = ignored or rules.ignored(rel_dir, True)
+            if not ignored:
+                rules = rules.for_directory(
+                    base_dir, rel_dir, directories_with_rules.get(rel_dir, ())
+                )
+            directories[rel_dir] = (ignored, rules)
+        return directories[rel_dir]
+
+    kept = []
+    for path in paths:
+        ignored, rules = directory(path.rpartition('/')[0])
+        if not ignored and not rules.ignored(path, False):
+            kept.append(path)
+    return kept
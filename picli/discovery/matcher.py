@@ -0,0 +1,216 @@
+import re
+
+
+class PatternMatcher(object):
+    """Matches paths against many glob patterns in a single pass
+
+    Every pattern is split on ``/`` and compiled into a shared segment
+    trie. A path is matched by walking its segments through the trie
+    once, so the cost of matching a path depends on how many trie
+    branches are live for it rather than on the number of patterns.
+    Children are looked up by exact name, by suffix (``*.py``) or as a
+    plain ``*`` wherever possible; only unusual segments fall back to a
+    per-segment regular expression.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self._root = _Node()
+        for pattern_id, pattern in enumerate(self.patterns):
+            self._add(pattern_id, pattern)
+
+    def _add(self, pattern_id, pattern):
+        node = self._root
+        segments = [
+            segment for segment in pattern.split('/')
+            if segment and segment != '.'
+        ]
+        for segment in segments:
+            node = node.child(segment)
+        if node.globstar_node:
+            node.globstar_terminals.append(pattern_id)
+        else:
+            node.terminals.append(pattern_id)
+
+    def match(self, path):
+        """
+        Return the ids of every pattern matching path.
+        Ids are indexes into self.patterns.
+        :param path: repo-relative path using '/' separators
+        :return: set
+        """
+        segments = path.split('/')
+        last = len(segments) - 1
+        states = self._root.closure
+        matched = set()
+        for position, segment in enumerate(segments):
+            hidden = segment.startswith('.')
+            final = position == last
+            next_states = []
+            for state in states:
+                if state.globstar_node and not hidden:
+                    if final:
+                        matched.update(state.globstar_terminals)
+                    else:
+                        next_states.append(state)
+                for child in state.children_matching(segment, hidden):
+                    if final:
+                        matched.update(child.terminals)
+                    else:
+                        next_states.extend(child.closure)
+            if not next_states:
+                break
+            states = next_states if len(next_states) == 1 else _unique(next_states)
+        return matched
+
+    def match_all(self, paths):
+        """
+        Assign every path to all of the patterns it matches.
+        :param paths: iterable of repo-relative paths
+        :return: list of path lists, one per pattern, in pattern order
+        """
+        matches = [[] for _ in self.patterns]
+        for path in paths:
+            for pattern_id in self.match(path):
+                matches[pattern_id].append(path)
+        return matches
+
+
+class _Node(object):
+    """A single segment of one or more patterns"""
+
+    def __init__(self, globstar_node=False):
+        self.globstar_node = globstar_node
+        self.terminals = []
+        self.globstar_terminals = []
+        self.globstar = None
+        self.literals = {}
+        self.suffixes = {}
+        self.any = None
+        self.wildcards = []
+        self._children = {}
+        self._closure = None
+
+    def child(self, segment):
+        """
+        Return the child node for segment, creating it if needed.
+        :param segment: glob pattern segment
+        :return: _Node
+        """
+        segment = re.sub(r'\*+', '*', segment) if segment != '**' else segment
+        if segment in self._children:
+            return self._children[segment]
+        if segment == '**':
+            node = self.globstar = _Node(globstar_node=True)
+        else:
+            node = _Node()
+            if not _is_magic(segment):
+                self.literals[segment] = node
+            elif segment == '*':
+                self.any = node
+            elif (segment.startswith('*') and not _is_magic(segment[1:]) and
+                  '.' in segment):
+                suffix = segment[1:]
+                extension = suffix[suffix.rfind('.'):]
+                self.suffixes.setdefault(extension, []).append((suffix, node))
+            else:
+                regex = re.compile(_translate_segment(segment) + r'\Z')
+                self.wildcards.append((regex, node))
+        self._children[segment] = node
+        return node
+
+    def children_matching(self, name, hidden):
+        """
+        Return every child node whose segment matches name.
+        :param name: path segment
+        :param hidden: whether name starts with a dot
+        :return: list
+        """
+        children = []
+        literal = self.literals.get(name)
+        if literal:
+            children.append(literal)
+        if not hidden:
+            if self.any:
+                children.append(self.any)
+            if self.suffixes:
+                dot = name.rfind('.')
+                if dot > 0:
+                    for suffix, node in self.suffixes.get(name[dot:], ()):
+                        if name.endswith(suffix):
+                            children.append(node)
+        for regex, node in self.wildcards:
+            if regex.match(name):
+                children.append(node)
+        return children
+
+    @property
+    def closure(self):
+        """
+        This node followed by the globstar nodes it can reach without
+        consuming a segment, since ``**`` may match zero directories.
+        :return: list of _Node
+        """
+        if self._closure is None:
+            self._closure = [self]
+            if self.globstar:
+                self._closure.extend(self.globstar.closure)
+        return self._closure
+
+
+def _unique(nodes):
+    seen = set()
+    return [
+        node for node in nodes
+        if not (id(node) in seen or seen.add(id(node)))
+    ]
+
+
+def _is_magic(segment):
+    return any(char in segment for char in '*?[')
+
+
+def _translate_segment(segment):
+    """
+    Translate a single path segment of a glob pattern.
+    Wildcards never cross a path separator and, like glob, never
+    match a leading dot unless the segment itself starts with one.
+    :param segment: glob pattern segment
+    :return: str
+    """
+    if not _is_magic(segment):
+        return re.escape(segment)
+    regex = ''
+    i, n = 0, len(segment)
+    while i < n:
+        char = segment[i]
+        i += 1
+        if char == '*':
+            if not regex.endswith('[^/]*'):
+                regex += '[^/]*'
+        elif char == '?':
+            regex += '[^/]'
+        elif char == '[':
+            j = i
+            if j < n and segment[j] == '!':
+                j += 1
+            if j < n and segment[j] == ']':
+                j += 1
+            while j < n and segment[j] != ']':
+                j += 1
+            if j >= n:
+                regex += r'\['
+            else:
+                chars = segment[i:j].replace('\\', r'\\')
+                chars = re.sub(r'([&~|])', r'\\\1', chars)
+                i = j + 1
+                if chars[0] == '!':
+                    chars = '^/' + chars[1:]
+                elif chars[0] in '^[':
+                    chars = '\\' + chars
+                regex += f'[{chars}]'
+        else:
+            regex += re.escape(char)
+    if not segment.startswith('.'):
+        regex = r'(?!\.)' + regex
+    return regex
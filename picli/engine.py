@@ -0,0 +1,129 @@
+import asyncio
+import sys
+
+from picli import logger
+from picli import util
+
+LOG = logger.get_logger(__name__)
+
+
+class ActionFailed(Exception):
+    """Raised inside the event loop when an action exits the run"""
+
+    def __init__(self, code, message=None):
+        super(ActionFailed, self).__init__(message)
+        self.code = code
+        self.message = message
+
+
+def call(function, *args):
+    """
+    Call a blocking function on a worker thread, turning the SystemExit
+    of util.sysexit_with_message into ActionFailed so the event loop can
+    cancel the remaining actions before exiting.
+    :param function: Function to call
+    :param args: Arguments of function
+    :return: Result of function
+    """
+    try:
+        return function(*args)
+    except SystemExit as e:
+        raise ActionFailed(e.code)
+
+
+async def guard(coroutine):
+    """
+    Await a coroutine that is about to become a task of its own, turning
+    the SystemExit of util.sysexit_with_message into ActionFailed. A
+    SystemExit raised inside a task would otherwise escape the event
+    loop before the remaining actions are cancelled.
+    :param coroutine: Coroutine to await
+    :return: Result of coroutine
+    """
+    try:
+        return await coroutine
+    except SystemExit as e:
+        raise ActionFailed(e.code)
+
+
+class Engine(object):
+    """Executes the actions of a PiCli run on one asyncio event loop
+
+    Every action is a coroutine scheduled on the same event loop. The
+    actions of each pipe are limited by the pipe's concurrency, each
+    action is bounded by the pipe's action timeout and results are
+    reported in the order the actions were given, each one as soon as
+    it and every action before it have finished. When an action fails
+    or times out the actions that haven't finished are cancelled and
+    the run exits.
+
+    Function calls go through the run's requests based Transport, whose
+    blocking calls are handed to the Transport's bounded pool of worker
+    threads. A call that is already in flight when its action is
+    cancelled can't be interrupted and ends with the transport's read
+    timeout, which never exceeds the action timeout.
+    """
+
+    def run(self, actions):
+        """
+        Execute actions and report their results.
+        :param actions: list of action objects
+        :return: list of results in the order of actions
+        """
+        if not actions:
+            return []
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self._run(actions))
+        except ActionFailed as e:
+            if e.message:
+                util.sysexit_with_message(e.message, e.code)
+            sys.exit(e.code)
+        finally:
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(
+                    asyncio.gather(*pending, return_exceptions=True)
+                )
+            loop.close()
+
+    async def _run(self, actions):
+        semaphores = {}
+        for action in actions:
+            if id(action.pipe_config) not in semaphores:
+                semaphores[id(action.pipe_config)] = asyncio.Semaphore(
+                    action.pipe_config.concurrency
+                )
+        tasks = [
+            asyncio.ensure_future(self._execute(
+                action, semaphores[id(action.pipe_config)]
+            ))
+            for action in actions
+        ]
+        results = []
+        try:
+            for action, task in zip(actions, tasks):
+                result = await task
+                action.report(result)
+                results.append(result)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        return results
+
+    async def _execute(self, action, semaphore):
+        async with semaphore:
+            timeout = action.pipe_config.action_timeout
+            try:
+                return await asyncio.wait_for(
+                    guard(action.execute()), timeout
+                )
+            except asyncio.TimeoutError:
+                raise ActionFailed(
+                    1, f'Failed to execute {action.name}. \n\n'
+                       f'Timed out after {timeout} seconds.'
+                )
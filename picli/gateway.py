@@ -0,0 +1,216 @@
+import hashlib
+import http.server
+import io
+import json
+import re
+import threading
+import zipfile
+
+import click
+
+from picli.actions import payload
+from picli import logger
+
+LOG = logger.get_logger(__name__)
+
+MAX_LINE_LENGTH = 79
+_FUNCTION_PATH = re.compile(r'^/function/(?P<name>[^/?]+)(?:/(?P<route>[^?]*))?')
+
+
+class BlobStore(object):
+    """In-memory content-addressed store of file contents"""
+
+    def __init__(self):
+        self._blobs = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        return key in self._blobs
+
+    def get(self, key):
+        return self._blobs.get(key)
+
+    def put(self, key, content):
+        with self._lock:
+            self._blobs.setdefault(key, content)
+
+
+class StandInGateway(http.server.ThreadingHTTPServer):
+    """Local stand-in for an OpenFaaS gateway and PiedPiper's functions
+
+    Serves every function PiCli calls under /function/{name}, so the
+    client, including content-addressed uploads, can be exercised
+    without an OpenFaaS installation. Uploaded files are kept in a
+    BlobStore for the lifetime of the server. The validator accepts any
+    configuration and every other function reports the lines of the
+    files it receives that are longer than MAX_LINE_LENGTH characters,
+    in flake8's format. Requests asking for per-file results get a JSON
+    object mapping every file to the list of its findings.
+    """
+
+    def __init__(self, address):
+        super(StandInGateway, self).__init__(address, _Handler)
+        self.blobs = BlobStore()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        match = _FUNCTION_PATH.match(self.path)
+        body = self._read_body()
+        if match is None:
+            return self._respond(404, 'text/plain', 'No such function')
+        name, route = match.group('name'), match.group('route')
+        if route == payload.MANIFEST_PATH:
+            return self._negotiate(body)
+        if route:
+            return self._respond(404, 'text/plain', f'No route {route}')
+        try:
+            files = self._unpack(body)
+        except (ValueError, zipfile.BadZipFile) as e:
+            return self._respond(400, 'text/plain', f'Invalid upload. {e}')
+        if isinstance(files, set):
+            return self._respond(
+                409, 'application/json', json.dumps({'missing': sorted(files)})
+            )
+        if name.startswith('piedpiper-validator-function'):
+            return self._respond(
+                200, 'application/json', json.dumps({'validate': []})
+            )
+        findings = {
+            path: _check_lines(path, content)
+            for path, content in sorted(files.items())
+            if path != 'run_vars.yml'
+        }
+        if self.headers.get(payload.RESULTS_HEADER) == payload.PER_FILE:
+            return self._respond(
+                200, 'application/json', json.dumps(findings),
+                {payload.RESULTS_HEADER: payload.PER_FILE}
+            )
+        return self._respond(200, 'text/plain', '\n'.join(
+            finding for path in findings for finding in findings[path]
+        ))
+
+    def _negotiate(self, body):
+        try:
+            document = json.loads(body)
+            algorithm = document['algorithm']
+            digests = document['files'].values()
+        except (ValueError, KeyError, AttributeError) as e:
+            return self._respond(400, 'text/plain', f'Invalid manifest. {e}')
+        missing = sorted({
+            digest for digest in digests
+            if (algorithm, digest) not in self.server.blobs
+        })
+        return self._respond(
+            200, 'application/json', json.dumps({'missing': missing})
+        )
+
+    def _unpack(self, body):
+        """
+        Extract the files of an uploaded zipfile, store their contents and
+        restore the files that are only referenced by the upload's
+        manifest from the blob store.
+        :param body: multipart/form-data request body
+        :return: dict of path to content, or the set of the digests of
+                 the manifest that aren't in the blob store
+        """
+        boundary = self.headers.get('Content-Type', '').partition('boundary=')[2]
+        if not boundary:
+            raise ValueError('Missing multipart boundary')
+        start = body.index(b'\r\n\r\n') + 4
+        end = body.rindex(f'\r\n--{boundary}--'.encode())
+        with zipfile.ZipFile(io.BytesIO(body[start:end])) as archive:
+            files = {name: archive.read(name) for name in archive.namelist()}
+        document = files.pop(payload.MANIFEST_FILE, None)
+        if document is None:
+            return files
+        document = json.loads(document)
+        algorithm = document['algorithm']
+        for path, content in files.items():
+            digest = hashlib.new(algorithm, content).hexdigest()
+            self.server.blobs.put((algorithm, digest), content)
+        missing = set()
+        for path, digest in document['files'].items():
+            if path in files:
+                continue
+            content = self.server.blobs.get((algorithm, digest))
+            if content is None:
+                missing.add(digest)
+            files[path] = content
+        return missing or files
+
+    def _read_body(self):
+        length = self.headers.get('Content-Length')
+        if length is not None:
+            return self.rfile.read(int(length))
+        chunks = []
+        while True:
+            size = int(self.rfile.readline().split(b';')[0], 16)
+            if not size:
+                self.rfile.readline()
+                return b''.join(chunks)
+            chunks.append(self.rfile.read(size))
+            self.rfile.readline()
+
+    def _respond(self, status, content_type, text, headers=None):
+        content = text.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        LOG.debug(format % args)
+
+
+def _check_lines(path, content):
+    """
+    Report every line of a file longer than MAX_LINE_LENGTH characters.
+    :param path: repo-relative path of the file
+    :param content: bytes
+    :return: list of findings
+    """
+    findings = []
+    lines = content.decode(errors='replace').splitlines()
+    for number, line in enumerate(lines, 1):
+        if len(line) > MAX_LINE_LENGTH:
+            findings.append(
+                f'{path}:{number}:{MAX_LINE_LENGTH + 1}: E501 line too '
+                f'long ({len(line)} > {MAX_LINE_LENGTH} characters)'
+            )
+    return findings
+
+
+@click.command()
+@click.option(
+    '--host',
+    default='127.0.0.1',
+    help='Address to listen on'
+)
+@click.option(
+    '--port',
+    default=8080,
+    help='Port to listen on'
+)
+def main(host, port):
+    """
+    Serve a local stand-in for the OpenFaaS gateway, e.g. at
+    http://127.0.0.1:8080/function as the url of a pipe.
+    """
+    server = StandInGateway((host, port))
+    LOG.info(f'Serving PiedPiper functions on http://{host}:{port}/function')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
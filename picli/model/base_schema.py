@@ -3,6 +3,25 @@ from marshmallow import Schema
 from marshmallow import RAISE
 from marshmallow import ValidationError
 from marshmallow import validates
+from marshmallow.validate import OneOf
+from marshmallow.validate import Range
+
+
+class PiTimeoutSchema(Schema):
+    connect = fields.Float(validate=Range(min=0, min_inclusive=False))
+    read = fields.Float(validate=Range(min=0, min_inclusive=False))
+    action = fields.Float(validate=Range(min=0, min_inclusive=False))
+
+
+class PiShardingSchema(Schema):
+    files = fields.Int(validate=Range(min=1))
+    size = fields.Int(validate=Range(min=1))
+
+
+class PiFileDiscoverySchema(Schema):
+    backend = fields.Str(validate=OneOf(['walk', 'git']))
+    untracked = fields.Bool()
+    workers = fields.Int(validate=Range(min=1))
 
 
 class PiGlobalVarsSchema(Schema):
@@ -10,6 +29,7 @@ class PiGlobalVarsSchema(Schema):
     ci_provider = fields.Str(required=True)
     vars_dir = fields.Str(required=True)
     version = fields.Str(required=True)
+    file_discovery = fields.Nested(PiFileDiscoverySchema)
 
     @validates
     def validate_ci_provider(self, value):
@@ -2,12 +2,22 @@ from marshmallow import fields
 from marshmallow import Schema
 from marshmallow import RAISE
 from marshmallow import ValidationError
+from marshmallow.validate import Range
+
+from picli.model.base_schema import PiShardingSchema
+from picli.model.base_schema import PiTimeoutSchema
 
 
 class PiStylePipeVarsSchema(Schema):
     run_pipe = fields.Bool(required=True)
     url = fields.Str(required=True)
     version = fields.Str(required=True)
+    timeout = fields.Nested(PiTimeoutSchema)
+    concurrency = fields.Int(validate=Range(min=1))
+    sharding = fields.Nested(PiShardingSchema)
+    content_addressed = fields.Bool()
+    cache_results = fields.Bool()
+    per_file_results = fields.Bool()
 
 
 class StylePipeConfigSchema(Schema):
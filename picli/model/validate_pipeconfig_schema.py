@@ -3,6 +3,8 @@ from marshmallow import Schema
 from marshmallow import RAISE
 from marshmallow import ValidationError
 
+from picli.model.base_schema import PiTimeoutSchema
+
 
 class PiPolicySchema(Schema):
     enabled = fields.Bool(required=True)
@@ -14,6 +16,7 @@ class PiValidatePipeVarsSchema(Schema):
     run_pipe = fields.Bool(required=True)
     url = fields.Str(required=True)
     version = fields.Str(required=True)
+    timeout = fields.Nested(PiTimeoutSchema)
     policy = fields.Nested(PiPolicySchema)
 
 
@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import pkgutil
+import tempfile
+
+from picli import configs
+from picli.configs.run_config import RunConfig
+from picli import logger
+from picli import util
+
+LOG = logger.get_logger(__name__)
+
+PLAN_FILE = '.picli-plan.json'
+_PLAN_VERSION = 1
+
+
+def pipe_names():
+    """
+    Names of every pipe that has a PipeConfig in picli.configs.
+    :return: sorted list
+    """
+    return sorted(
+        pipe[:-len('_pipe')]
+        for _, pipe, _ in pkgutil.iter_modules(configs.__path__)
+        if pipe.endswith('_pipe') and pipe != 'base_pipe'
+    )
+
+
+def fingerprint(context):
+    """
+    Fingerprint everything the routing of a run depends on: the content
+    of the configuration files in piedpiper.d, the paths of the files in
+    the project, the pipes PiCli knows about and, for --changed-since
+    runs, the changed files.
+    File contents outside of piedpiper.d don't affect routing, so only
+    their paths are hashed and the fingerprint stays cheap to compute.
+    :param context: RunContext object
+    :return: str
+    """
+    digest = hashlib.sha256()
+    digest.update(
+        f'{_PLAN_VERSION}\0{context.changed_since}\0'
+        f'{",".join(pipe_names())}\0'.encode()
+    )
+    base_dir = context.base_config.base_dir
+    config_files = {os.path.abspath(context.config)}
+    for root, dirs, files in os.walk(context.base_config.piedpiper_dir):
+        config_files.update(os.path.join(root, name) for name in files)
+    for config_file in sorted(config_files):
+        with open(config_file, 'rb') as file:
+            content = file.read()
+        digest.update(_encode(os.path.relpath(config_file, base_dir)))
+        digest.update(hashlib.sha256(content).digest())
+    for path in context.file_index.files:
+        if path != PLAN_FILE:
+            digest.update(_encode(path))
+    if context.changed_files is not None:
+        digest.update(b'\0')
+        for path in sorted(context.changed_files):
+            if path != PLAN_FILE:
+                digest.update(_encode(path))
+    return digest.hexdigest()
+
+
+def _encode(path):
+    return path.encode('utf-8', 'surrogateescape') + b'\0'
+
+
+class RoutingPlan(object):
+    """Precomputed routing table of a PiCli run
+
+    Records, for every pipe, its pipe_vars and the files each group of
+    the pipe runs on, together with the file_vars overrides of those
+    files. Paths are stored once and relative to the project so a plan
+    computed in one CI stage can be reused by parallel jobs working on
+    a different checkout of the same tree. The plan carries the
+    fingerprint of the inputs it was resolved from and is ignored once
+    they change.
+    """
+
+    def __init__(self, document):
+        self.document = document
+
+    @property
+    def fingerprint(self):
+        return self.document['fingerprint']
+
+    @property
+    def files(self):
+        return self.document['files']
+
+    @classmethod
+    def build(cls, context):
+        """
+        Resolve the configuration of every pipe of the run.
+        :param context: RunContext object
+        :return: RoutingPlan object
+        """
+        files = {}
+        pipes = {}
+        for name in pipe_names():
+            pipe_config = context.pipe_config(name)
+            pipes[name] = {
+                'pipe_vars': pipe_config.pipe_config,
+                'run_configs': [
+                    {
+                        'name': run_config.name,
+                        'config': run_config.config,
+                        'files': [
+                            files.setdefault(path, len(files))
+                            for path in run_config.paths()
+                        ],
+                    }
+                    for run_config in pipe_config.run_config
+                ],
+            }
+        return cls({
+            'version': _PLAN_VERSION,
+            'fingerprint': fingerprint(context),
+            'changed_since': context.changed_since,
+            'files': list(files),
+            'file_vars': {
+                path: file_config
+                for path, file_config in context.file_vars.items()
+                if path in files
+            },
+            'pipes': pipes,
+        })
+
+    @classmethod
+    def load(cls, plan_file):
+        """
+        Load a plan written by save.
+        :param plan_file: Path to the plan
+        :return: RoutingPlan object or None if there is no usable plan
+        """
+        try:
+            with open(plan_file, 'r') as plan:
+                document = json.load(plan)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            LOG.warn(f'Ignoring unreadable plan {plan_file}. {e}')
+            return None
+        if not isinstance(document, dict) or \
+                document.get('version') != _PLAN_VERSION:
+            LOG.warn(f'Ignoring plan {plan_file} written by another '
+                     f'version of PiCli.')
+            return None
+        return cls(document)
+
+    def save(self, plan_file):
+        """
+        Atomically write the plan to plan_file.
+        :param plan_file: Path to write the plan to
+        :return: None
+        """
+        try:
+            with tempfile.NamedTemporaryFile(
+                    'w', dir=os.path.dirname(plan_file), delete=False) as plan:
+                json.dump(self.document, plan, sort_keys=True,
+                          separators=(',', ':'))
+            os.chmod(plan.name, 0o644)
+            os.replace(plan.name, plan_file)
+        except (OSError, TypeError, ValueError) as e:
+            message = f'Unable to write plan to {plan_file}.\n\n{e}'
+            util.sysexit_with_message(message)
+
+    def pipe_vars(self, name):
+        """
+        Return the pipe_vars of the named pipe.
+        :param name: Name of the pipe, e.g. style
+        :return: dict
+        """
+        return self.document['pipes'][name]['pipe_vars']
+
+    def run_configs(self, name, base_config):
+        """
+        Build the RunConfig objects of the named pipe from the plan.
+        :param name: Name of the pipe, e.g. style
+        :param base_config: BaseConfig object
+        :return: list of RunConfig objects
+        """
+        files = self.files
+        file_vars = self.document['file_vars']
+        return [
+            PlannedRunConfig(
+                run_config['name'],
+                run_config['config'],
+                base_config,
+                file_vars,
+                [files[index] for index in run_config['files']]
+            )
+            for run_config in self.document['pipes'][name]['run_configs']
+        ]
+
+
+class PlannedRunConfig(RunConfig):
+    """RunConfig whose files were resolved by ``picli plan``"""
+
+    def __init__(self, name, config, base_config, file_vars, paths):
+        super(PlannedRunConfig, self).__init__(
+            name, config, base_config, file_vars
+        )
+        self._paths = paths
+
+    def paths(self):
+        return iter(self._paths)
@@ -25,6 +25,7 @@ def main(context, config, debug):
 
 
 main.add_command(command.lint.lint)
+main.add_command(command.plan.plan)
 main.add_command(command.style.style)
 main.add_command(command.sast.sast)
 main.add_command(command.validate.validate)
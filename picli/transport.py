@@ -0,0 +1,96 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from picli import logger
+
+LOG = logger.get_logger(__name__)
+
+POOL_SIZE = 32
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 900
+
+
+class Transport(object):
+    """HTTP transport shared by every action of a run
+
+    Owns a single requests.Session so that validate, style and sast
+    reuse keep-alive connections to the OpenFaaS gateway instead of
+    opening a new connection for every function call. The session is
+    created on first use and its connection pool is sized for actions
+    dispatched concurrently.
+
+    The Engine's event loop sends requests with post_async, which runs
+    the blocking call on the transport's own pool of worker threads,
+    one per pooled connection. A call that is already in flight when
+    its action is cancelled can't be interrupted and ends with the read
+    timeout, which never exceeds the pipe's action timeout.
+    """
+
+    def __init__(self, pool_size=POOL_SIZE):
+        self.pool_size = pool_size
+        self._session = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=4, pool_maxsize=self.pool_size
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._session = session
+        return self._session
+
+    def post(self, url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), **kwargs):
+        """
+        Send a POST request over the shared session.
+        :param url: URL to post to
+        :param timeout: tuple of the connect and read timeouts in seconds
+        :param kwargs: Arguments of requests.Session.post
+        :return: requests.Response
+        """
+        return self.session.post(url, timeout=timeout, **kwargs)
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.pool_size,
+                    thread_name_prefix='picli-transport'
+                )
+        return self._executor
+
+    async def post_async(self, url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                         **kwargs):
+        """
+        Send a POST request from the event loop on one of the
+        transport's worker threads.
+        :param url: URL to post to
+        :param timeout: tuple of the connect and read timeouts in seconds
+        :param kwargs: Arguments of requests.Session.post
+        :return: requests.Response
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            functools.partial(self.post, url, timeout=timeout, **kwargs)
+        )
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
@@ -1,9 +1,12 @@
 import anyconfig
+from collections.abc import Mapping
 from typing import Dict
+import os
 import re
 import sys
 import yaml
 
+from picli.cache import yaml_cache
 from picli.logger import get_logger
 
 LOG = get_logger(__name__)
@@ -14,6 +17,20 @@ class SafeDumper(yaml.SafeDumper):
         return super(SafeDumper, self).increase_indent(flow, False)
 
 
+# Prefer the libyaml loader when PyYAML was built with it. Documents are
+# always written by SafeDumper: libyaml's emitter has no equivalent of its
+# increase_indent override, and the run_vars sent to functions must not
+# depend on how PyYAML was built on the host.
+try:
+    from yaml import CSafeLoader as Loader
+except ImportError:
+    from yaml import SafeLoader as Loader
+
+# Read-only mappings, such as the file definitions of a RunConfig, are
+# written out as plain YAML mappings.
+SafeDumper.add_multi_representer(Mapping, SafeDumper.represent_dict)
+
+
 def merge_dicts(a: Dict, b: Dict) -> Dict:
     """
     Merges the values of B into A and returns a mutated dict A.
@@ -52,18 +69,35 @@ def camelize(string):
 
 def safe_load(string):
     try:
-        return yaml.safe_load(string) or {}
+        return yaml.load(string, Loader=Loader) or {}
     except yaml.scanner.ScannerError as e:
         print(e)
 
 
 def safe_load_file(filename):
+    """
+    Load a YAML file, reusing the parsed document from PiCli's YAML cache
+    when the file's size, mtime and content hash are unchanged.
+    :param filename: Path to the YAML file
+    :return: Parsed document
+    """
     try:
-        with open(filename) as file:
-            return safe_load(file)
+        with open(filename, 'rb') as file:
+            content = file.read()
+            stat = os.fstat(file.fileno())
     except EnvironmentError as e:
         message = f"Unable to load file {filename}.\n\n{e}"
         sysexit_with_message(message)
+    cache = yaml_cache.get_yaml_cache()
+    if cache is None:
+        return safe_load(content)
+    digest = yaml_cache.digest(content)
+    document = cache.get(filename, stat, digest)
+    if document is None:
+        document = safe_load(content)
+        if document is not None:
+            cache.set(filename, stat, digest, document)
+    return document
 
 
 def safe_dump(data):
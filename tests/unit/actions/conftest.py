@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+from picli.actions import base
+from picli.cache.result_cache import get_result_cache
+from picli.command.style import Style
+from picli.context import RunContext
+from picli.engine import Engine
+
+FILES = {
+    'src/a.py': 'a = 1  # ' + 'a' * 80 + '\n',
+    'src/b.py': 'b = 2\n',
+    'src/c.py': 'c = 3\n' + 'c = 4  # ' + 'c' * 90 + '\n',
+}
+
+
+class StyleProject(object):
+    """Project whose flake8 action is sent to a StandInGateway
+
+    Every run builds a new RunContext, like a new PiCli invocation.
+    uploads holds the sorted repo-relative paths of the files zipped by
+    each upload.
+    """
+
+    def __init__(self, base_dir, url, pipe_vars, uploads):
+        self.base_dir = base_dir
+        self.uploads = uploads
+        base_dir.join('piedpiper.d', 'pi_global_vars.yml').write('\n'.join([
+            '---',
+            'pi_global_vars:',
+            '  project_name: "project"',
+            '  ci_provider: "gitlab-ci"',
+            '  vars_dir: "default_vars.d"',
+            '  version: "0.0.0"',
+            '',
+        ]), ensure=True)
+        vars_dir = base_dir.join('piedpiper.d', 'default_vars.d')
+        vars_dir.join('file_vars.d').ensure(dir=True)
+        vars_dir.join('pipe_vars.d', 'pi_style.yml').write('\n'.join([
+            '---',
+            'pi_style_pipe_vars:',
+            '  run_pipe: true',
+            '  version: latest',
+            f'  url: {url}',
+        ] + [f'  {name}: {value}' for name, value in pipe_vars.items()] + [
+            '',
+        ]), ensure=True)
+        vars_dir.join('group_vars.d', 'python.yml').write('\n'.join([
+            '---',
+            'pi_style:',
+            '  - name: "src/*.py"',
+            '    styler: flake8',
+            '',
+        ]), ensure=True)
+        for path, content in FILES.items():
+            self.write(path, content)
+
+    def write(self, path, content):
+        self.base_dir.join(path).write(content, ensure=True)
+
+    def context(self):
+        return RunContext(
+            str(self.base_dir.join('piedpiper.d', 'pi_global_vars.yml')),
+            False,
+            use_plan=False
+        )
+
+    def run(self, context=None):
+        """
+        Run the flake8 action of the project on an Engine.
+        :param context: RunContext of the run, a new one by default
+        :return: Result of the action
+        """
+        context = context or self.context()
+        actions = Style(context).actions()
+        assert [action.name for action in actions] == ['flake8']
+        return Engine().run(actions)[0]
+
+
+@pytest.fixture
+def style_project(tmpdir, monkeypatch, gateway):
+    """Factory of a StyleProject with the given style pipe_vars"""
+    monkeypatch.setenv('PICLI_CACHE_DIR', str(tmpdir.join('cache')))
+    get_result_cache.cache_clear()
+    base_dir = tmpdir.join('project')
+    uploads = []
+    zip_files = base.Base.zip_files
+
+    def spy(self, zip_file, files=None):
+        if files is None:
+            files = self.run_config.files
+        uploads.append(sorted(
+            os.path.relpath(file['file'], str(base_dir)) for file in files
+        ))
+        return zip_files(self, zip_file, files)
+
+    monkeypatch.setattr(base.Base, 'zip_files', spy)
+
+    def build(**pipe_vars):
+        return StyleProject(base_dir, gateway.url, pipe_vars, uploads)
+
+    yield build
+    get_result_cache.cache_clear()
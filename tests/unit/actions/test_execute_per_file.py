@@ -0,0 +1,78 @@
+from picli.actions import payload
+from picli import gateway as gateway_module
+
+ALL_FILES = ['src/a.py', 'src/b.py', 'src/c.py']
+FINDINGS = '\n'.join([
+    'src/a.py:1:80: E501 line too long (89 > 79 characters)',
+    'src/c.py:2:80: E501 line too long (99 > 79 characters)',
+])
+EDITED_FINDINGS = '\n'.join([
+    'src/a.py:1:80: E501 line too long (89 > 79 characters)',
+    'src/b.py:1:80: E501 line too long (89 > 79 characters)',
+    'src/c.py:2:80: E501 line too long (99 > 79 characters)',
+])
+
+
+def _answer_plainly(monkeypatch):
+    """
+    Make the gateway ignore the RESULTS_HEADER, like a function that
+    doesn't support per-file results, and mark its plain responses.
+    """
+    do_post = gateway_module._Handler.do_POST
+    respond = gateway_module._Handler._respond
+
+    def do_post_without_header(self):
+        del self.headers[payload.RESULTS_HEADER]
+        return do_post(self)
+
+    def respond_plainly(self, status, content_type, text, headers=None):
+        return respond(self, status, content_type, f'plain:\n{text}', headers)
+
+    monkeypatch.setattr(
+        gateway_module._Handler, 'do_POST', do_post_without_header
+    )
+    monkeypatch.setattr(gateway_module._Handler, '_respond', respond_plainly)
+
+
+def test_first_run_sends_every_file(style_project):
+    project = style_project(per_file_results='true')
+
+    assert project.run() == FINDINGS
+    assert project.uploads == [ALL_FILES]
+
+
+def test_rerun_sends_nothing(style_project):
+    project = style_project(per_file_results='true')
+    project.run()
+
+    assert project.run() == FINDINGS
+    assert project.uploads == [ALL_FILES]
+
+
+def test_edited_file_is_the_only_one_sent(style_project):
+    project = style_project(per_file_results='true')
+    project.run()
+    project.write('src/b.py', 'b = 2  # ' + 'b' * 80 + '\n')
+
+    assert project.run() == EDITED_FINDINGS
+    assert project.uploads == [ALL_FILES, ['src/b.py']]
+
+
+def test_function_without_per_file_results_gets_every_file(style_project,
+                                                           monkeypatch):
+    project = style_project(per_file_results='true')
+    project.run()
+    project.write('src/b.py', 'b = 2  # ' + 'b' * 80 + '\n')
+    _answer_plainly(monkeypatch)
+
+    assert project.run() == f'plain:\n{EDITED_FINDINGS}'
+    assert project.uploads == [ALL_FILES, ['src/b.py'], ALL_FILES]
+
+
+def test_plain_response_is_returned_unchanged(style_project, monkeypatch):
+    _answer_plainly(monkeypatch)
+    project = style_project(per_file_results='true')
+
+    assert project.run() == f'plain:\n{FINDINGS}'
+    assert project.run() == f'plain:\n{FINDINGS}'
+    assert project.uploads == [ALL_FILES, ALL_FILES]
@@ -0,0 +1,43 @@
+from picli.command.base import execute_sequence
+
+FINDINGS = '\n'.join([
+    'src/a.py:1:80: E501 line too long (89 > 79 characters)',
+    'src/c.py:2:80: E501 line too long (99 > 79 characters)',
+])
+
+
+def _count_connections(gateway, monkeypatch):
+    connections = []
+    verify_request = gateway.verify_request
+
+    def spy(request, client_address):
+        connections.append(client_address)
+        return verify_request(request, client_address)
+
+    monkeypatch.setattr(gateway, 'verify_request', spy)
+    return connections
+
+
+def test_stages_of_a_run_reuse_one_connection(style_project, gateway,
+                                              monkeypatch):
+    connections = _count_connections(gateway, monkeypatch)
+    project = style_project()
+    context = project.context()
+    try:
+        assert project.run(context) == FINDINGS
+        assert project.run(context) == FINDINGS
+    finally:
+        context.close()
+
+    assert len(connections) == 1
+
+
+def test_sequence_closes_the_connections_of_the_run(style_project, gateway,
+                                                    monkeypatch):
+    connections = _count_connections(gateway, monkeypatch)
+    project = style_project()
+    context = project.context()
+    execute_sequence(context, ['style'])
+    execute_sequence(context, ['style'])
+
+    assert len(connections) == 2
@@ -0,0 +1,55 @@
+import threading
+import time
+
+from picli.command.style import Style
+from picli.engine import Engine
+from picli import gateway as gateway_module
+
+
+def _count_in_flight(monkeypatch):
+    """
+    Slow the gateway's functions down and record the largest number of
+    requests it was serving at once.
+    """
+    lock = threading.Lock()
+    state = {'in_flight': 0, 'most': 0}
+    do_post = gateway_module._Handler.do_POST
+
+    def counting_do_post(self):
+        with lock:
+            state['in_flight'] += 1
+            state['most'] = max(state['most'], state['in_flight'])
+        try:
+            time.sleep(0.05)
+            return do_post(self)
+        finally:
+            with lock:
+                state['in_flight'] -= 1
+
+    monkeypatch.setattr(gateway_module._Handler, 'do_POST', counting_do_post)
+    return state
+
+
+def test_actions_of_a_pipe_share_its_concurrency(style_project, monkeypatch):
+    state = _count_in_flight(monkeypatch)
+    project = style_project(concurrency=2, sharding='{files: 1}')
+    project.write('src/d.cpp', 'int d = 1;\n')
+    project.write('piedpiper.d/default_vars.d/group_vars.d/cpp.yml', '\n'.join([
+        '---',
+        'pi_style:',
+        '  - name: "src/*.cpp"',
+        '    styler: cpplint',
+        '',
+    ]))
+    context = project.context()
+    try:
+        actions = Style(context).actions()
+        assert [len(action.shards) for action in actions] == [3, 1]
+        Engine().run(actions)
+    finally:
+        context.close()
+
+    assert sorted(project.uploads) == [
+        ['src/a.py'], ['src/b.py'], ['src/c.py'], ['src/d.cpp']
+    ]
+    assert state['most'] == 2
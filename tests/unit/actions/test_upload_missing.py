@@ -0,0 +1,62 @@
+import pytest
+
+from picli.actions import base
+from picli import gateway as gateway_module
+
+ALL_FILES = ['src/a.py', 'src/b.py', 'src/c.py']
+FINDINGS = '\n'.join([
+    'src/a.py:1:80: E501 line too long (89 > 79 characters)',
+    'src/c.py:2:80: E501 line too long (99 > 79 characters)',
+])
+
+
+def test_only_missing_files_are_uploaded(style_project):
+    project = style_project(content_addressed='true')
+
+    assert project.run() == FINDINGS
+    assert project.run() == FINDINGS
+    assert project.uploads == [ALL_FILES, []]
+
+
+def test_only_edited_files_are_uploaded_again(style_project):
+    project = style_project(content_addressed='true')
+    project.run()
+    project.write('src/b.py', 'b = 2  # ' + 'b' * 80 + '\n')
+
+    assert project.run() == '\n'.join([
+        'src/a.py:1:80: E501 line too long (89 > 79 characters)',
+        'src/b.py:1:80: E501 line too long (89 > 79 characters)',
+        'src/c.py:2:80: E501 line too long (99 > 79 characters)',
+    ])
+    assert project.uploads == [ALL_FILES, ['src/b.py']]
+
+
+def test_every_file_is_uploaded_when_blobs_are_lost(style_project, gateway,
+                                                    monkeypatch):
+    project = style_project(content_addressed='true')
+    project.run()
+    negotiate = base.Base._negotiate
+
+    async def lose_blobs(self, document):
+        missing = await negotiate(self, document)
+        gateway.blobs = gateway_module.BlobStore()
+        return missing
+
+    monkeypatch.setattr(base.Base, '_negotiate', lose_blobs)
+
+    assert project.run() == FINDINGS
+    assert project.uploads == [ALL_FILES, [], ALL_FILES]
+
+
+@pytest.mark.parametrize('status', [404, 405, 501])
+def test_every_file_is_uploaded_without_protocol_support(style_project,
+                                                         monkeypatch, status):
+    def negotiate(self, body):
+        return self._respond(status, 'text/plain', 'Not supported')
+
+    monkeypatch.setattr(gateway_module._Handler, '_negotiate', negotiate)
+    project = style_project(content_addressed='true')
+
+    assert project.run() == FINDINGS
+    assert project.run() == FINDINGS
+    assert project.uploads == [ALL_FILES, ALL_FILES]
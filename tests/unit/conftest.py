@@ -0,0 +1,21 @@
+import threading
+
+import pytest
+
+from picli.gateway import StandInGateway
+
+
+@pytest.fixture
+def gateway():
+    """StandInGateway serving on an ephemeral port for one test"""
+    server = StandInGateway(('127.0.0.1', 0))
+    server.url = f'http://127.0.0.1:{server.server_port}/function'
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={'poll_interval': 0.01},
+        daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
@@ -0,0 +1,158 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from picli.discovery.file_index import FileIndex
+from picli.discovery.ignore import filter_paths
+
+IGNORE_FILES = {
+    '.gitignore': '\n'.join([
+        '# comment',
+        '*.log',
+        '!keep.log',
+        '/build',
+        'dist/',
+        '**/tmp/**',
+        'docs/**/*.html',
+        '\\#hash.txt',
+        '\\!bang.txt',
+        '*.py[co]',
+        'foo?bar.txt',
+        'node_modules/',
+        '',
+    ]),
+    'src/.gitignore': '\n'.join([
+        '*.gen.c',
+        '!important.gen.c',
+        '/local.txt',
+        'cache/',
+        '',
+    ]),
+    'src/sub/.gitignore': '\n'.join([
+        '!*.log',
+        'deep/',
+        '',
+    ]),
+}
+
+FILES = [
+    'README.md',
+    'keep.log',
+    'x.log',
+    '#hash.txt',
+    '!bang.txt',
+    'm.py',
+    'm.pyc',
+    'foo1bar.txt',
+    'foobar.txt',
+    'build/x.txt',
+    'a/dist',
+    'b/dist/z.txt',
+    'tmp/a.txt',
+    'x/tmp/b.txt',
+    'x/tmp/nested/c.txt',
+    'docs/d.html',
+    'docs/a/b/c.html',
+    'docs/a/b/c.md',
+    'node_modules/p/q.js',
+    'src/build/y.txt',
+    'src/a.gen.c',
+    'src/important.gen.c',
+    'src/main.c',
+    'src/local.txt',
+    'src/x/local.txt',
+    'src/cache/c.txt',
+    'src/x/cache/d.txt',
+    'src/sub/e.log',
+    'src/sub/f.c',
+    'src/sub/deep/g.txt',
+    'src/sub/x/h.log',
+]
+
+# A fixed mtime well outside the racy window of the file index cache
+OLD_MTIME = 1500000000
+
+
+def _git(base_dir, *args):
+    return subprocess.run(
+        ['git', '-c', 'core.excludesFile=/dev/null'] + list(args),
+        cwd=str(base_dir),
+        stdout=subprocess.PIPE,
+        check=True
+    ).stdout
+
+
+def _git_files(base_dir):
+    listing = _git(base_dir, 'ls-files', '-z', '-co', '--exclude-standard')
+    return sorted(path for path in listing.decode().split('\0') if path)
+
+
+def _age(base_dir, mtime=OLD_MTIME):
+    for root, dirs, files in os.walk(str(base_dir)):
+        dirs[:] = [name for name in dirs if name != '.git']
+        for name in dirs + files:
+            os.utime(os.path.join(root, name), (mtime, mtime))
+    os.utime(str(base_dir), (mtime, mtime))
+
+
+@pytest.fixture
+def project(tmpdir, monkeypatch):
+    if shutil.which('git') is None:
+        pytest.skip('git is not installed')
+    monkeypatch.setenv('PICLI_CACHE_DIR', str(tmpdir.join('cache')))
+    base_dir = tmpdir.join('project')
+    for path in FILES:
+        base_dir.join(path).ensure()
+    for path, content in IGNORE_FILES.items():
+        base_dir.join(path).write(content, ensure=True)
+    _git(base_dir, 'init', '-q')
+    _age(base_dir)
+    return base_dir
+
+
+def test_walk_matches_git(project):
+    files = FileIndex(str(project)).files
+
+    assert files == _git_files(project)
+
+
+def test_filter_paths_matches_git(project):
+    paths = sorted(
+        os.path.relpath(os.path.join(root, name), str(project))
+        for root, dirs, files in os.walk(str(project))
+        if '.git' not in os.path.relpath(root, str(project)).split(os.sep)
+        for name in files
+    )
+
+    assert filter_paths(str(project), paths, ('.gitignore',)) == \
+        _git_files(project)
+
+
+def test_cached_walk_rescans_after_ignore_file_edit(project):
+    assert FileIndex(str(project)).files == _git_files(project)
+
+    ignore_file = project.join('src', '.gitignore')
+    ignore_file.write(ignore_file.read() + '!cache/\nmain.c\n')
+    os.utime(str(ignore_file), (OLD_MTIME + 60, OLD_MTIME + 60))
+    files = FileIndex(str(project)).files
+
+    assert 'src/main.c' not in files
+    assert 'src/cache/c.txt' in files
+    assert files == _git_files(project)
+
+
+def test_cached_walk_is_reused_when_nothing_changed(project, monkeypatch):
+    expected = FileIndex(str(project)).files
+    scanned = []
+    scan = FileIndex._scan
+
+    def spy(self, rel_dir, mtime, rules):
+        scanned.append(rel_dir)
+        return scan(self, rel_dir, mtime, rules)
+
+    monkeypatch.setattr(FileIndex, '_scan', spy)
+
+    assert FileIndex(str(project)).files == expected
+    assert scanned == []
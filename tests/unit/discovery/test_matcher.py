@@ -0,0 +1,103 @@
+import glob
+import os
+
+import pytest
+
+from picli.discovery.matcher import PatternMatcher
+
+FILES = [
+    'README.md',
+    'README.rst',
+    'setup.py',
+    '.hidden.py',
+    '.hidden/config.py',
+    '.hidden/nested/deep.py',
+    'a.py',
+    'b.py',
+    'c.cpp',
+    'abc.py',
+    'main_test.py',
+    'test_1.py',
+    'test_12.py',
+    'docs/index.md',
+    'docs/.draft.md',
+    'src/main.cpp',
+    'src/main.h',
+    'src/lib/util.cpp',
+    'src/lib/util.h',
+    'src/lib/util_test.py',
+    'src/lib/sub/helper.py',
+    'src/lib/sub/deeper/helper.py',
+    'src/.cache/cached.cpp',
+    'src/sub/test_a.py',
+    'x/y.py',
+    'x/a/y.py',
+    'x/a/b/y.py',
+    'tools/[special].py',
+]
+
+PATTERNS = [
+    '**',
+    '**/*',
+    '**/*.py',
+    '**.py',
+    '*.py',
+    '*',
+    '*/*',
+    '.*',
+    '**/.*',
+    '.hidden/*',
+    '.hidden/**/*.py',
+    'src/**',
+    'src/**/*.cpp',
+    'src/*/*.h',
+    'src/**/sub/**/*.py',
+    '**/*.[ch]',
+    '**/*.[!p]*',
+    '**/test_?.py',
+    '[!a]*.py',
+    '[ab]*.py',
+    '**/*_test.py',
+    'x/**/**/y.py',
+    'README*',
+    './docs/*.md',
+    'tools/[[]special].py',
+    'missing/**',
+]
+
+
+@pytest.fixture(scope='module')
+def tree(tmpdir_factory):
+    base_dir = tmpdir_factory.mktemp('tree')
+    for path in FILES:
+        base_dir.join(path).ensure()
+    return base_dir
+
+
+@pytest.mark.parametrize('pattern', PATTERNS)
+def test_match_all_agrees_with_glob(tree, pattern):
+    with tree.as_cwd():
+        expected = sorted({
+            os.path.normpath(path).replace(os.sep, '/')
+            for path in glob.glob(pattern, recursive=True)
+            if os.path.isfile(path)
+        })
+    matches = PatternMatcher([pattern]).match_all(sorted(FILES))
+
+    assert sorted(matches[0]) == expected
+
+
+def test_match_all_assigns_paths_to_every_pattern_in_order():
+    patterns = ['**/*.py', 'src/**', '*.cpp', 'src/lib/*.h']
+    matches = PatternMatcher(patterns).match_all(sorted(FILES))
+
+    assert matches[0] == sorted(
+        path for path in FILES
+        if path.endswith('.py') and not any(
+            segment.startswith('.') for segment in path.split('/')
+        )
+    )
+    assert 'src/lib/util.h' in matches[1]
+    assert 'src/.cache/cached.cpp' not in matches[1]
+    assert matches[2] == ['c.cpp']
+    assert matches[3] == ['src/lib/util.h']
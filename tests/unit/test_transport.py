@@ -0,0 +1,83 @@
+import asyncio
+import json
+import socket
+import threading
+
+import pytest
+import requests
+
+from picli import transport
+
+MANIFEST = json.dumps({'algorithm': 'sha256', 'files': {'a.py': '00'}})
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_post_reuses_keep_alive_connections(gateway, monkeypatch):
+    connections = []
+    verify_request = gateway.verify_request
+
+    def spy(request, client_address):
+        connections.append(client_address)
+        return verify_request(request, client_address)
+
+    monkeypatch.setattr(gateway, 'verify_request', spy)
+    client = transport.Transport()
+
+    async def post_twice():
+        return [
+            await client.post_async(
+                f'{gateway.url}/flake8/manifest', data=MANIFEST
+            )
+            for _ in range(2)
+        ]
+
+    try:
+        responses = _run(post_twice())
+    finally:
+        client.close()
+
+    assert [r.json() for r in responses] == [{'missing': ['00']}] * 2
+    assert len(connections) == 1
+
+
+def test_post_raises_for_status(gateway):
+    client = transport.Transport()
+    try:
+        response = _run(client.post_async(f'{gateway.url}/flake8/unknown'))
+    finally:
+        client.close()
+
+    assert response.status_code == 404
+    with pytest.raises(requests.exceptions.HTTPError, match='404'):
+        response.raise_for_status()
+
+
+def test_post_times_out_reading_the_response():
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    accepted = []
+    thread = threading.Thread(
+        target=lambda: accepted.append(server.accept()[0]), daemon=True
+    )
+    thread.start()
+    client = transport.Transport()
+    try:
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            _run(client.post_async(
+                f'http://127.0.0.1:{server.getsockname()[1]}/function',
+                data=b'{}', timeout=(1, 0.1)
+            ))
+    finally:
+        client.close()
+        thread.join()
+        for connection in accepted:
+            connection.close()
+        server.close()
@@ -0,0 +1,23 @@
+from picli.configs.run_config import FileDefinition
+from picli import util
+
+
+def test_safe_dump_indents_sequences_inside_mappings():
+    document = util.safe_dump({'file_config': [{'file': '/a.py'}]})
+
+    assert document == '---\nfile_config:\n  - file: /a.py\n'
+
+
+def test_safe_dump_writes_file_definitions_as_mappings():
+    definition = FileDefinition('/project', 'src/a.py', {'styler': 'flake8'})
+    document = util.safe_dump({'file_config': [definition]})
+
+    assert document == '---\nfile_config:\n' \
+                       '  - file: /project/src/a.py\n' \
+                       '    styler: flake8\n'
+
+
+def test_safe_load_round_trips_safe_dump():
+    data = {'file_config': [{'file': '/a.py', 'styler': 'flake8'}], 'n': 1}
+
+    assert util.safe_load(util.safe_dump(data)) == data
@@ -0,0 +1,44 @@
+"""Benchmark the throughput of the content-digest engine
+
+Hashes every file of a project with DigestEngine at increasing thread
+counts and reports files/s and MiB/s, to confirm hashing saturates the
+disk of a runner. Run it twice to see the effect of the page cache; drop
+caches between runs (echo 3 > /proc/sys/vm/drop_caches) to measure the
+disk itself. A final run with the persistent digest cache, after it
+was filled by a first one, shows the cost of a re-run on an unchanged
+workspace.
+
+Usage: python tools/benchmarks/digest_throughput.py base_dir [max_workers]
+"""
+import sys
+import time
+
+from picli.discovery.digest import DigestEngine
+from picli.discovery.file_index import FileIndex
+
+
+def main(base_dir, max_workers):
+    files = FileIndex(base_dir).files
+    workers = 1
+    while workers <= max_workers:
+        run(f'{workers:>3} threads', DigestEngine(
+            base_dir, workers, use_cache=False
+        ), files)
+        workers *= 2
+    DigestEngine(base_dir).manifest(files)
+    run('     cached', DigestEngine(base_dir), files)
+
+
+def run(label, engine, files):
+    start = time.perf_counter()
+    manifest = engine.manifest(files)
+    elapsed = time.perf_counter() - start
+    size = sum(entry.size for entry in manifest.values()) / 2 ** 20
+    print(f'{label}  {len(manifest):>8} files  '
+          f'{size:9.1f}MiB  {elapsed:7.3f}s  '
+          f'{len(manifest) / elapsed:9.0f} files/s  '
+          f'{size / elapsed:8.1f}MiB/s')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 32)
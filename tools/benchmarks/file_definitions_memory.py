@@ -0,0 +1,69 @@
+"""Benchmark the memory held by RunConfig file definitions
+
+Builds a synthetic index of repo-relative paths, with file_vars
+overrides for one file in a hundred, and measures with tracemalloc the
+memory of materializing one definition per file, first as the
+``{'file': '/abs/path', **file_vars}`` dicts PiCli used to build and
+then as FileDefinition records. The index itself is allocated before
+measuring, as both representations share it.
+
+Usage: python tools/benchmarks/file_definitions_memory.py [files]
+"""
+import os
+import sys
+import tracemalloc
+
+from picli.configs.run_config import FileDefinition
+
+BASE_DIR = '/bench/monorepo'
+
+
+def build_index(files):
+    paths = [
+        f'services/{i % 211}/src/{i % 997}/module_{i}.py'
+        for i in range(files)
+    ]
+    file_vars = {
+        path: {'styler': 'flake8', 'max_line_length': 120}
+        for path in paths[::100]
+    }
+    return paths, file_vars
+
+
+def dicts(paths, file_vars):
+    definitions = []
+    for path in paths:
+        definition = {'file': os.path.join(BASE_DIR, path)}
+        overrides = file_vars.get(path)
+        if overrides:
+            definition.update(overrides)
+        definitions.append(definition)
+    return definitions
+
+
+def records(paths, file_vars):
+    return [
+        FileDefinition(BASE_DIR, path, file_vars.get(path))
+        for path in paths
+    ]
+
+
+def measure(build, paths, file_vars):
+    tracemalloc.start()
+    definitions = build(paths, file_vars)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del definitions
+    return current
+
+
+def main(files):
+    paths, file_vars = build_index(files)
+    for name, build in (('dict', dicts), ('FileDefinition', records)):
+        used = measure(build, paths, file_vars)
+        print(f'{name:>15}  {files:>8} files  {used / 2 ** 20:8.1f}MiB  '
+              f'{used / files:6.0f}B/file')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500000)
@@ -0,0 +1,83 @@
+"""Benchmark BasePipeConfig._merge_run_configs
+
+Builds synthetic run configurations (an all.yml group claiming every
+file plus a handful of language groups claiming a share of them) and
+times the merge at increasing sizes. The merge itself only records the
+exclusions, so the timing covers iterating the merged file definitions,
+which is where the claimed files are resolved. Time per file definition
+should stay flat as the number of definitions grows.
+
+Usage: python tools/benchmarks/merge_run_configs.py [max_definitions]
+"""
+import sys
+import time
+
+from picli.configs.base_pipe import BasePipeConfig
+from picli.configs.run_config import RunConfig
+from picli.discovery.file_index import FileIndex
+
+BASE_DIR = '/bench'
+GROUPS = ('python_lint.yml', 'cpp_lint.yml', 'js_lint.yml', 'go_lint.yml')
+
+
+class _BaseConfig(object):
+
+    def __init__(self, file_index):
+        self.base_dir = BASE_DIR
+        self.file_index = file_index
+
+
+class _PipeConfig(BasePipeConfig):
+
+    def __init__(self):
+        pass
+
+    @property
+    def name(self):
+        return 'bench'
+
+
+def build_run_configs(definitions):
+    """
+    Split definitions between all.yml and the language groups so that
+    half of all.yml is claimed by a more specific group.
+    """
+    files = int(definitions / 1.5)
+    file_index = FileIndex(BASE_DIR)
+    file_index._files = [
+        f'src/{i % 997}/file_{i}.src' for i in range(files)
+    ]
+    file_index._matches['**'] = file_index._files
+    base_config = _BaseConfig(file_index)
+    run_configs = [RunConfig('all.yml', [{'name': '**'}], base_config)]
+    for number, group in enumerate(GROUPS):
+        pattern = f'{group}/**'
+        file_index._matches[pattern] = \
+            file_index._files[number::len(GROUPS) * 2]
+        run_configs.append(RunConfig(group, [{'name': pattern}], base_config))
+    return run_configs
+
+
+def main(max_definitions):
+    pipe_config = _PipeConfig()
+    definitions = 1000
+    while definitions <= max_definitions:
+        run_configs = build_run_configs(definitions)
+        total = sum(
+            len(run_config.base_config.file_index.match(group['name']))
+            for run_config in run_configs
+            for group in run_config.config
+        )
+        start = time.perf_counter()
+        pipe_config._merge_run_configs(run_configs)
+        for run_config in run_configs:
+            for _ in run_config.files:
+                pass
+        elapsed = time.perf_counter() - start
+        print(f'{total:>9} definitions  {elapsed:8.3f}s  '
+              f'{elapsed / total * 1e9:7.0f}ns/definition')
+        definitions *= 10
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
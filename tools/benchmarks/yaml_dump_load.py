@@ -0,0 +1,66 @@
+"""Benchmark the pure Python and libyaml YAML paths of picli.util
+
+Dumps and re-loads a run_vars document listing a large number of files
+the way actions do, once with PyYAML's pure Python SafeLoader and once
+with the libyaml loader util selects. Documents are always written by
+util.SafeDumper; libyaml's dumper is measured for reference only, since
+it can't keep SafeDumper's indentation.
+
+Usage: python tools/benchmarks/yaml_dump_load.py [files]
+"""
+import sys
+import time
+
+import yaml
+
+from picli import util
+
+
+def build_run_vars(files):
+    return {
+        'file_config': [
+            {'file': f'/builds/project/src/{i % 997}/file_{i}.py'}
+            for i in range(files)
+        ],
+        'group_configs': [{'name': '**/**.py', 'styler': 'flake8'}],
+        'pi_global_vars': {
+            'project_name': 'bench',
+            'ci_provider': 'gitlab-ci',
+            'vars_dir': 'default_vars.d',
+            'version': '0.0.0',
+        },
+        'pi_style_pipe_vars': {
+            'run_pipe': True,
+            'url': 'http://127.0.0.1:8080/function',
+            'version': 'latest',
+        },
+    }
+
+
+def measure(label, run_vars, loader, dumper):
+    start = time.perf_counter()
+    document = yaml.dump(run_vars, Dumper=dumper,
+                         default_flow_style=False,
+                         explicit_start=True)
+    dumped = time.perf_counter()
+    loaded = yaml.load(document, Loader=loader)
+    end = time.perf_counter()
+    assert loaded == run_vars
+    print(f'{label:<8} dump {dumped - start:7.3f}s  '
+          f'load {end - dumped:7.3f}s  '
+          f'({len(document) / 2 ** 20:.1f} MiB)')
+
+
+def main(files):
+    run_vars = build_run_vars(files)
+    print(f'run_vars listing {files} files')
+    measure('python', run_vars, yaml.SafeLoader, util.SafeDumper)
+    if util.Loader is yaml.SafeLoader:
+        print('libyaml bindings are not available')
+    else:
+        measure('libyaml', run_vars, util.Loader, util.SafeDumper)
+        measure('cdumper', run_vars, util.Loader, yaml.CSafeDumper)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)